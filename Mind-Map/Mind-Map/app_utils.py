@@ -1,8 +1,23 @@
+import hashlib
+import json
+import os
+import queue
+import re
+import socket
+import sqlite3
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import httpcore
+import httpx
 import ollama
-from PySide6.QtCore import QThread, Signal, QByteArray, Qt
-from PySide6.QtGui import QIcon, QColor, QPixmap, QPainter
+from PySide6.QtCore import QObject, Signal, QByteArray, Qt, QStandardPaths
+from PySide6.QtGui import QIcon, QColor, QPixmap, QPainter, QGuiApplication
 from PySide6.QtSvg import QSvgRenderer
 
+from mindmap_core import merge_heading_trees
+
 # --- Icon Generation System ---
 
 class IconFactory:
@@ -13,23 +28,46 @@ class IconFactory:
         "save": '<path d="M19 21H5a2 2 0 0 1-2-2V5a2 2 0 0 1 2-2h11l5 5v11a2 2 0 0 1-2 2z"></path><polyline points="17 21 17 13 7 13 7 21"></polyline><polyline points="7 3 7 8 15 8"></polyline>',
         "render": '<polyline points="23 4 23 10 17 10"></polyline><polyline points="1 20 1 14 7 14"></polyline><path d="M3.51 9a9 9 0 0 1 14.85-3.36L23 10M1 14l4.64 4.36A9 9 0 0 0 20.49 15"></path>',
         "enhance": '<rect x="4" y="4" width="16" height="16" rx="2" ry="2"></rect><rect x="9" y="9" width="6" height="6"></rect><line x1="9" y1="1" x2="9" y2="4"></line><line x1="15" y1="1" x2="15" y2="4"></line><line x1="9" y1="20" x2="9" y2="23"></line><line x1="15" y1="20" x2="15" y2="23"></line><line x1="20" y1="9" x2="23" y2="9"></line><line x1="20" y1="14" x2="23" y2="14"></line><line x1="1" y1="9" x2="4" y2="9"></line><line x1="1" y1="14" x2="4" y2="14"></line>',
-        "export": '<path d="M18 13v6a2 2 0 0 1-2 2H5a2 2 0 0 1-2-2V8a2 2 0 0 1 2-2h6"></path><polyline points="15 3 21 3 21 9"></polyline><line x1="10" y1="14" x2="21" y2="3"></line>'
+        "export": '<path d="M18 13v6a2 2 0 0 1-2 2H5a2 2 0 0 1-2-2V8a2 2 0 0 1 2-2h6"></path><polyline points="15 3 21 3 21 9"></polyline><line x1="10" y1="14" x2="21" y2="3"></line>',
+        "previous": '<polyline points="18 15 12 9 6 15"></polyline>',
+        "next": '<polyline points="6 9 12 15 18 9"></polyline>',
+        "cancel": '<line x1="18" y1="6" x2="6" y2="18"></line><line x1="6" y1="6" x2="18" y2="18"></line>'
     }
 
+    # Scales pre-rasterized for every icon, on top of those of the connected screens.
+    SCALES = (1.0, 1.5, 2.0, 3.0)
+
+    # Parsed renderers are kept alive by name; pixmaps and icons are memoized.
+    _renderers = {}
+    _pixmaps = {}
+    _icons = {}
+
     @staticmethod
-    def create_icon(name: str, color: QColor) -> QIcon:
-        """
-        Creates a QIcon from stored SVG data, tinted with the specified color.
-        """
-        svg_path_data = IconFactory._SVG_DATA.get(name)
-        if not svg_path_data:
-            return QIcon()
+    def renderer(name: str) -> QSvgRenderer:
+        """Returns the shared QSvgRenderer for an icon, parsing its SVG on first use, or None."""
+        renderer = IconFactory._renderers.get(name)
+        if renderer is None:
+            svg_path_data = IconFactory._SVG_DATA.get(name)
+            if not svg_path_data:
+                return None
+            full_svg = f'<svg xmlns="http://www.w3.org/2000/svg" width="24" height="24" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round">{svg_path_data}</svg>'
+            renderer = QSvgRenderer(QByteArray(full_svg.encode('utf-8')))
+            IconFactory._renderers[name] = renderer
+        return renderer
 
-        full_svg = f'<svg xmlns="http://www.w3.org/2000/svg" width="24" height="24" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round">{svg_path_data}</svg>'
-        
-        renderer = QSvgRenderer(QByteArray(full_svg.encode('utf-8')))
-        
-        pixmap = QPixmap(renderer.defaultSize())
+    @staticmethod
+    def pixmap(name: str, color: QColor, size: int = 24, device_pixel_ratio: float = 1.0) -> QPixmap:
+        """Returns the icon rasterized at `size` for `device_pixel_ratio`, tinted with `color`."""
+        key = (name, QColor(color).rgba(), size, device_pixel_ratio)
+        pixmap = IconFactory._pixmaps.get(key)
+        if pixmap is not None:
+            return pixmap
+        renderer = IconFactory.renderer(name)
+        if renderer is None:
+            return QPixmap()
+
+        pixels = round(size * device_pixel_ratio)
+        pixmap = QPixmap(pixels, pixels)
         pixmap.fill(Qt.transparent)
         
         painter = QPainter(pixmap)
@@ -38,8 +76,30 @@ class IconFactory:
         painter.setCompositionMode(QPainter.CompositionMode_SourceIn)
         painter.fillRect(pixmap.rect(), color)
         painter.end()
-        
-        return QIcon(pixmap)
+
+        pixmap.setDevicePixelRatio(device_pixel_ratio)
+        IconFactory._pixmaps[key] = pixmap
+        return pixmap
+
+    @staticmethod
+    def create_icon(name: str, color: QColor, size: int = 24) -> QIcon:
+        """
+        Creates a QIcon from stored SVG data, tinted with the specified color.
+        """
+        key = (name, QColor(color).rgba(), size)
+        icon = IconFactory._icons.get(key)
+        if icon is not None:
+            return icon
+        if IconFactory.renderer(name) is None:
+            return QIcon()
+
+        scales = set(IconFactory.SCALES)
+        scales.update(screen.devicePixelRatio() for screen in QGuiApplication.screens())
+        icon = QIcon()
+        for scale in sorted(scales):
+            icon.addPixmap(IconFactory.pixmap(name, color, size, scale))
+        IconFactory._icons[key] = icon
+        return icon
 
 # --- AI Enhancement System Prompt and Worker ---
 
@@ -80,39 +140,475 @@ Your Markdown Output:
 Do not make the graphs too long! Unless explicitly requested otherwise.
 """
 
-class AIWorker(QThread):
-    """Worker thread to process text with Ollama without freezing the UI."""
+AI_TITLE_SYSTEM_PROMPT = """
+You name mind maps. You are given the section headings of a mind map that was built from a long document.
+Reply with **ONLY** a concise title (at most eight words) for the whole map. No quotes, no Markdown, no explanations.
+"""
+
+_BLANK_LINE = re.compile(r"\n[^\S\n]*\n")
+_THINK_BLOCK = re.compile(r"<think>.*?</think>", re.S)
+
+def split_into_chunks(text, max_chars):
+    """Splits `text` into pieces of at most `max_chars` characters at paragraph boundaries."""
+    pieces = []
+    for paragraph in _BLANK_LINE.split(text):
+        paragraph = paragraph.strip()
+        if len(paragraph) <= max_chars:
+            if paragraph:
+                pieces.append(paragraph)
+            continue
+        for line in paragraph.splitlines():
+            while len(line) > max_chars:
+                cut = line.rfind(' ', 0, max_chars + 1)
+                if cut <= 0:
+                    cut = max_chars
+                pieces.append(line[:cut])
+                line = line[cut:].lstrip()
+            if line.strip():
+                pieces.append(line)
+
+    chunks = []
+    current = []
+    length = 0
+    for piece in pieces:
+        if current and length + 2 + len(piece) > max_chars:
+            chunks.append("\n\n".join(current))
+            current, length = [], 0
+        current.append(piece)
+        length += 2 + len(piece) if len(current) > 1 else len(piece)
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+class AICache:
+    """On-disk LRU cache of AI enhancement results, stored compressed in SQLite."""
+    def __init__(self, path=None, max_bytes=32 * 1024 * 1024):
+        if path is None:
+            cache_dir = QStandardPaths.writableLocation(QStandardPaths.GenericCacheLocation)
+            path = os.path.join(cache_dir, "Tree-Graph-MindMap", "ai_cache.sqlite3")
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = None
+        self._size = 0
+        self._clock = 0
+        self._failed = False
+
+    @staticmethod
+    def key(model, system_prompt, options, text):
+        """Returns the cache key for one enhancement request."""
+        payload = json.dumps([model, system_prompt, options or {}, text], sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).digest()
+
+    def set_max_bytes(self, max_bytes):
+        """Changes the size cap, evicting straight away if the cache is now over it."""
+        with self._lock:
+            self.max_bytes = max_bytes
+            if self._connect():
+                try:
+                    self._evict()
+                except sqlite3.Error:
+                    pass
+
+    def get(self, key):
+        """Returns the cached text for `key`, or None, and marks the entry as recently used."""
+        with self._lock:
+            text = None
+            if self._connect():
+                try:
+                    row = self._db.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+                    if row:
+                        text = zlib.decompress(row[0]).decode('utf-8')
+                        self._clock += 1
+                        self._db.execute("UPDATE entries SET used = ? WHERE key = ?", (self._clock, key))
+                        self._db.commit()
+                except (sqlite3.Error, zlib.error, UnicodeDecodeError):
+                    text = None
+            if text is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return text
+
+    def put(self, key, text):
+        """Stores `text` under `key`, then evicts down to the size cap."""
+        value = zlib.compress(text.encode('utf-8'), 9)
+        with self._lock:
+            if not self._connect():
+                return
+            try:
+                old = self._db.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+                self._clock += 1
+                self._db.execute("INSERT OR REPLACE INTO entries (key, value, size, used) VALUES (?, ?, ?, ?)",
+                                 (key, value, len(value), self._clock))
+                self._size += len(value) - (old[0] if old else 0)
+                self._evict()
+            except sqlite3.Error:
+                pass
+
+    def clear(self):
+        """Removes every entry; the counters are kept."""
+        with self._lock:
+            if self._connect():
+                try:
+                    self._db.execute("DELETE FROM entries")
+                    self._db.commit()
+                    self._size = 0
+                except sqlite3.Error:
+                    pass
+
+    def __len__(self):
+        with self._lock:
+            if not self._connect():
+                return 0
+            try:
+                return self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            except sqlite3.Error:
+                return 0
+
+    def _connect(self):
+        if self._db is not None:
+            return True
+        if self._failed:
+            return False
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            db = sqlite3.connect(self.path, check_same_thread=False)
+            db.execute("CREATE TABLE IF NOT EXISTS entries "
+                       "(key BLOB PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, used INTEGER NOT NULL) "
+                       "WITHOUT ROWID")
+            db.execute("CREATE INDEX IF NOT EXISTS entries_used ON entries (used)")
+            size, clock = db.execute("SELECT COALESCE(SUM(size), 0), COALESCE(MAX(used), 0) FROM entries").fetchone()
+        except (OSError, sqlite3.Error):
+            self._failed = True
+            return False
+        self._db, self._size, self._clock = db, size, clock
+        return True
+
+    def _evict(self):
+        if self._size > self.max_bytes:
+            evicted = []
+            for key, size in self._db.execute("SELECT key, size FROM entries ORDER BY used"):
+                if self._size <= self.max_bytes:
+                    break
+                evicted.append((key,))
+                self._size -= size
+            self._db.executemany("DELETE FROM entries WHERE key = ?", evicted)
+        self._db.commit()
+
+class AIRequestCancelled(Exception):
+    """Raised inside the AI service when the request it is serving has been cancelled."""
+
+class AIRequest:
+    """One enhancement queued on the AI service; `cancelled` is set once it is cancelled or superseded."""
+    def __init__(self, request_id, text):
+        self.id = request_id
+        self.text = text
+        self.cancelled = threading.Event()
+        # Connections carrying this request's completions, by the thread using them.
+        self._streams = {}
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        """Marks the request cancelled and aborts its in-flight connections."""
+        self.cancelled.set()
+        with self._lock:
+            streams, self._streams = self._streams, {}
+        for stream in streams:
+            stream.abort()
+
+    def attach(self, stream):
+        with self._lock:
+            if not self.cancelled.is_set():
+                self._streams[stream] = threading.get_ident()
+                return
+        stream.abort()
+
+    def release(self):
+        """Forgets the connections used by the calling thread, which go back to the pool."""
+        thread = threading.get_ident()
+        with self._lock:
+            self._streams = {stream: owner for stream, owner in self._streams.items() if owner != thread}
+
+# The request each thread is completing, so connections can be attached to it.
+_serving = threading.local()
+
+class _AbortableStream(httpcore.NetworkStream):
+    """Network stream that attaches itself to the request its thread is serving, so it can be aborted."""
+    def __init__(self, stream):
+        self._stream = stream
+
+    def _track(self):
+        request = getattr(_serving, 'request', None)
+        if request is not None:
+            request.attach(self)
+
+    def read(self, max_bytes, timeout=None):
+        self._track()
+        return self._stream.read(max_bytes, timeout)
+
+    def write(self, buffer, timeout=None):
+        self._track()
+        self._stream.write(buffer, timeout)
+
+    def close(self):
+        self._stream.close()
+
+    def start_tls(self, ssl_context, server_hostname=None, timeout=None):
+        return _AbortableStream(self._stream.start_tls(ssl_context, server_hostname, timeout))
+
+    def get_extra_info(self, info):
+        return self._stream.get_extra_info(info)
+
+    def abort(self):
+        # Unlike close(), shutdown wakes a read blocked in another thread.
+        sock = self._stream.get_extra_info("socket")
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+class _AbortableBackend(httpcore.SyncBackend):
+    def connect_tcp(self, *args, **kwargs):
+        return _AbortableStream(super().connect_tcp(*args, **kwargs))
+
+    def connect_unix_socket(self, *args, **kwargs):
+        return _AbortableStream(super().connect_unix_socket(*args, **kwargs))
+
+def _abortable_transport():
+    transport = httpx.HTTPTransport()
+    # httpx has no public hook for the network backend; without it, cancels wait for the next piece.
+    pool = getattr(transport, '_pool', None)
+    if hasattr(pool, '_network_backend'):
+        pool._network_backend = _AbortableBackend()
+    return transport
+
+class AIService(QObject):
+    """Long-lived service that runs AI enhancements off the GUI thread, one request at a time."""
+    # Leaves room for the system prompt and the answer in the model's default context.
+    CHUNK_CHARS = 6000
+    MAX_PARALLEL = 4
+
+    chunk = Signal(str)
+    preview = Signal(str)
+    progress = Signal(int, int)
     finished = Signal(str)
     error = Signal(str)
+    cancelled = Signal()
+
+    # Emitted from the service thread, tagged with the id of the request they serve.
+    _chunk_ready = Signal(int, str)
+    _preview_ready = Signal(int, str)
+    _progress_made = Signal(int, int, int)
+    _result_ready = Signal(int, str)
+    _error_raised = Signal(int, str)
 
-    def __init__(self, text_to_process, model='qwen3:8b'):
-        super().__init__()
-        self.text = text_to_process
+    def __init__(self, model='qwen3:8b', cache=None, options=None, host=None, parent=None):
+        super().__init__(parent)
         self.model = model
+        self.cache = cache
+        self.options = options
+        self.client = ollama.Client(host=host, transport=_abortable_transport())
+        self.current = None
+        self._next_id = 0
+        self._queue = queue.Queue()
+        self._pool = ThreadPoolExecutor(max_workers=self.MAX_PARALLEL)
+        self._chunk_ready.connect(self._relay_chunk)
+        self._preview_ready.connect(self._relay_preview)
+        self._progress_made.connect(self._relay_progress)
+        self._result_ready.connect(self._relay_result)
+        self._error_raised.connect(self._relay_error)
+        self._thread = threading.Thread(target=self._serve, name="AIService", daemon=True)
+        self._thread.start()
 
-    def run(self):
-        try:
-            messages = [
-                {'role': 'system', 'content': AI_MARKDOWN_SYSTEM_PROMPT},
-                {'role': 'user', 'content': self.text}
-            ]
-            
-            response = ollama.chat(model=self.model, messages=messages)
-            
-            if 'message' in response and 'content' in response['message']:
-                self.finished.emit(response['message']['content'])
-            else:
-                self.error.emit("Received an invalid response from the AI model.")
-        
-        except Exception as e:
-            error_msg = str(e)
-            if "could not connect to ollama" in error_msg.lower() or "connection refused" in error_msg.lower():
-                self.error.emit("Connection Error: Could not connect to Ollama. Please ensure the Ollama service is running on your system.")
+    def is_busy(self):
+        return self.current is not None
+
+    def submit(self, text):
+        """Queues an enhancement of `text`, superseding any unfinished one, and returns its id."""
+        if self.current is not None:
+            self.current.cancel()
+        self._next_id += 1
+        self.current = AIRequest(self._next_id, text)
+        self._queue.put(self.current)
+        return self.current.id
+
+    def cancel(self):
+        """Cancels the current request, if any, and emits `cancelled`."""
+        if self.current is None:
+            return
+        self.current.cancel()
+        self.current = None
+        self.cancelled.emit()
+
+    def shutdown(self):
+        """Cancels pending work and lets the service thread exit."""
+        if self.current is not None:
+            self.current.cancel()
+            self.current = None
+        self._queue.put(None)
+        self._pool.shutdown(wait=False)
+
+    # --- GUI thread ---
+
+    def _is_current(self, request_id):
+        return self.current is not None and self.current.id == request_id
+
+    def _relay_chunk(self, request_id, text):
+        if self._is_current(request_id):
+            self.chunk.emit(text)
+
+    def _relay_preview(self, request_id, text):
+        if self._is_current(request_id):
+            self.preview.emit(text)
+
+    def _relay_progress(self, request_id, done, total):
+        if self._is_current(request_id):
+            self.progress.emit(done, total)
+
+    def _relay_result(self, request_id, text):
+        if self._is_current(request_id):
+            self.current = None
+            self.finished.emit(text)
+
+    def _relay_error(self, request_id, message):
+        if self._is_current(request_id):
+            self.current = None
+            self.error.emit(message)
+
+    # --- Service thread ---
+
+    def _serve(self):
+        while True:
+            request = self._queue.get()
+            if request is None:
+                return
+            if request.cancelled.is_set():
+                continue
+            try:
+                result = self._process(request)
+            except AIRequestCancelled:
+                continue
+            except Exception as e:
+                error_msg = str(e)
+                if "could not connect to ollama" in error_msg.lower() or "connection refused" in error_msg.lower():
+                    self._error_raised.emit(request.id, "Connection Error: Could not connect to Ollama. Please ensure the Ollama service is running on your system.")
+                else:
+                    self._error_raised.emit(request.id, f"An AI processing error occurred: {error_msg}")
+                continue
+
+            if result:
+                self._result_ready.emit(request.id, result)
             else:
-                self.error.emit(f"An AI processing error occurred: {error_msg}")
+                self._error_raised.emit(request.id, "Received an invalid response from the AI model.")
+
+    def _process(self, request):
+        cache_key = None
+        if self.cache is not None:
+            cache_key = AICache.key(self.model, AI_MARKDOWN_SYSTEM_PROMPT, self.options, request.text)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        chunks = split_into_chunks(request.text, self.CHUNK_CHARS)
+        if len(chunks) > 1:
+            result = self._map_reduce(request, chunks)
+        else:
+            result = self._complete(request, AI_MARKDOWN_SYSTEM_PROMPT, request.text,
+                                    lambda content: self._chunk_ready.emit(request.id, content))
+        if result and cache_key is not None:
+            self.cache.put(cache_key, result)
+        return result
+
+    def _complete(self, request, system_prompt, text, on_chunk=None):
+        """Streams one chat completion and returns its text, passing each piece to `on_chunk`."""
+        messages = [
+            {'role': 'system', 'content': system_prompt},
+            {'role': 'user', 'content': text}
+        ]
+
+        parts = []
+        _serving.request = request
+        stream = self.client.chat(model=self.model, messages=messages, options=self.options, stream=True)
+        try:
+            for response in stream:
+                if request.cancelled.is_set():
+                    raise AIRequestCancelled()
+                if 'message' in response and 'content' in response['message']:
+                    content = response['message']['content']
+                    if content:
+                        parts.append(content)
+                        if on_chunk:
+                            on_chunk(content)
+        except Exception:
+            # An aborted connection surfaces as a transport error.
+            if request.cancelled.is_set():
+                raise AIRequestCancelled() from None
+            raise
+        finally:
+            # Closing the stream drops the connection, so Ollama stops generating too.
+            stream.close()
+            _serving.request = None
+            request.release()
+        if request.cancelled.is_set():
+            raise AIRequestCancelled()
+        return ''.join(parts)
+
+    def _structure_chunk(self, request, text):
+        if request.cancelled.is_set():
+            raise AIRequestCancelled()
+        if self.cache is None:
+            return self._complete(request, AI_MARKDOWN_SYSTEM_PROMPT, text)
+        key = AICache.key(self.model, AI_MARKDOWN_SYSTEM_PROMPT, self.options, text)
+        result = self.cache.get(key)
+        if result is None:
+            result = self._complete(request, AI_MARKDOWN_SYSTEM_PROMPT, text)
+            if result:
+                self.cache.put(key, result)
+        return result
+
+    def _map_reduce(self, request, chunks):
+        partials = [None] * len(chunks)
+        futures = {self._pool.submit(self._structure_chunk, request, chunk): i for i, chunk in enumerate(chunks)}
+        try:
+            for done, future in enumerate(as_completed(futures), 1):
+                partials[futures[future]] = future.result()
+                self._progress_made.emit(request.id, done, len(chunks))
+                self._preview_ready.emit(request.id, merge_heading_trees(p for p in partials if p))
+        except BaseException:
+            request.cancel()
+            for future in futures:
+                future.cancel()
+            raise
+
+        merged = merge_heading_trees(partials)
+        sections = [line[3:] for line in merged.splitlines() if line.startswith("## ")]
+        if not sections:
+            return merged
+        # Consolidation: only the section headings go back to the model, to name the single root.
+        title = _THINK_BLOCK.sub('', self._complete(request, AI_TITLE_SYSTEM_PROMPT, "\n".join(sections)))
+        title = next((line.strip('# "*').strip() for line in reversed(title.splitlines()) if line.strip('# "*').strip()), "")
+        return merge_heading_trees(partials, title or None)
 
 class StyleSheet:
     """Defines stylesheets for the application, supporting light and dark themes."""
+    # Complete window stylesheets, assembled on first use of each theme.
+    _compiled = {}
+
+    @staticmethod
+    def for_theme(is_dark_theme: bool) -> str:
+        """Returns the whole stylesheet for the main window in one theme, base background included."""
+        sheet = StyleSheet._compiled.get(is_dark_theme)
+        if sheet is None:
+            frame_color = "#3f3f3f" if is_dark_theme else "#cccccc"
+            rules = StyleSheet.DARK_THEME if is_dark_theme else StyleSheet.LIGHT_THEME
+            sheet = f"* {{ background-color: {frame_color}; }}\n{rules}"
+            StyleSheet._compiled[is_dark_theme] = sheet
+        return sheet
+
     DARK_THEME = """
         /* General */
         #MainWindowContainer, QMenu, QColorDialog {
@@ -135,7 +631,9 @@ class StyleSheet:
             background-color: #252526;
             border-top: 1px solid #3f3f3f;
         }
-        #StatusBar #BreadcrumbLabel {
+        #StatusBar QToolButton { background-color: transparent; border: none; border-radius: 3px; padding: 1px; }
+        #StatusBar QToolButton:hover { background-color: #3e3e3e; }
+        #StatusBar #BreadcrumbLabel, #StatusBar #ExportStatusLabel {
             color: #9e9e9e;
             font-weight: normal;
             font-size: 9pt;
@@ -267,7 +765,9 @@ class StyleSheet:
             background-color: #e1e1e1;
             border-top: 1px solid #cccccc;
         }
-        #StatusBar #BreadcrumbLabel {
+        #StatusBar QToolButton { background-color: transparent; border: none; border-radius: 3px; padding: 1px; }
+        #StatusBar QToolButton:hover { background-color: #dcdcdc; }
+        #StatusBar #BreadcrumbLabel, #StatusBar #ExportStatusLabel {
             color: #555555;
             font-weight: normal;
             font-size: 9pt;
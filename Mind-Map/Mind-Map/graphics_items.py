@@ -1,89 +1,384 @@
-import PySide6.QtCore
+import math
+import threading
+from array import array
+from collections import OrderedDict
 
-from PySide6.QtGui import QPainterPath, QPainter, QPen, QColor, QBrush, QFont
+from PySide6.QtGui import (QPainterPath, QPainter, QPen, QColor, QBrush, QFont, QTextDocument,
+                           QPixmap, QPixmapCache, QTransform, QPalette, QAbstractTextDocumentLayout)
 from PySide6.QtWidgets import (QGraphicsScene, QGraphicsView, QGraphicsItem, 
-                               QColorDialog, QGraphicsPathItem)
-from PySide6.QtCore import Qt, QRectF, QPointF, Signal
+                               QColorDialog, QGraphicsTextItem, QStyleOptionGraphicsItem)
+from PySide6.QtCore import Qt, QRectF, QPointF, QLineF, Signal, QObject, QRunnable, QThreadPool, QTimer
 
-class Connection(QGraphicsPathItem):
-    """Represents a dynamic connection line between two nodes in the mind map."""
-    def __init__(self, start_node, end_node):
+from mindmap_core import Node, MindMapModel, SearchIndex, SpatialHash, TidyTreeLayout, bounding_box, parse_markdown
+
+NODE_PADDING = 20
+NODE_RADIUS = 20
+NODE_FONT = QFont("Segoe UI", 10)
+
+class TextMeasurer:
+    """Measures wrapped label heights off the scene, memoised in an LRU cache keyed on (text, width, font)."""
+    def __init__(self, capacity=50000):
+        self.capacity = capacity
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def text_height(self, text, width, font=NODE_FONT):
+        key = (text, width, font.key())
+        with self._lock:
+            height = self._cache.get(key)
+            if height is not None:
+                self._cache.move_to_end(key)
+                return height
+
+        document = QTextDocument()
+        document.setDefaultFont(font)
+        document.setTextWidth(width)
+        document.setPlainText(text)
+        height = document.size().height()
+
+        with self._lock:
+            self._cache[key] = height
+            if len(self._cache) > self.capacity:
+                self._cache.popitem(last=False)
+        return height
+
+text_measurer = TextMeasurer()
+
+def measure_node_height(node):
+    """Returns the height a node needs for its wrapped label."""
+    return max(Node.HEIGHT, text_measurer.text_height(node.text, node.width - NODE_PADDING) + NODE_PADDING)
+
+class LevelOfDetail:
+    """Zoom thresholds (device pixels per scene unit) for dropping labels, decorations and curves."""
+    def __init__(self, text=0.35, decoration=0.25, curves=0.2):
+        self.text = text
+        self.decoration = decoration
+        self.curves = curves
+
+class Theme:
+    """Scene colors that painters read at paint time."""
+    def __init__(self, background, node_text, grid):
+        self.background = QColor(background)
+        self.node_text = QColor(node_text)
+        self.grid = QColor(grid)
+        # Labels are drawn through this palette instead of a per-item default text color.
+        self.text_palette = QPalette()
+        self.text_palette.setColor(QPalette.Text, self.node_text)
+
+Theme.DARK = Theme("#2a2a2a", "#ffffff", QColor(60, 60, 60))
+Theme.LIGHT = Theme("#ffffff", "#1e1e1e", QColor(220, 220, 220))
+
+def _clip_edge(sx, sy, ex, ey, top, bottom):
+    """Returns the control points of the part of an edge curve between `top` and `bottom`."""
+    def parameter(y):
+        s = min(1.0, max(0.0, (y - sy) / (ey - sy)))
+        return 0.5 - math.sin(math.asin(1.0 - 2.0 * s) / 3.0)
+
+    t0, t1 = sorted((parameter(top), parameter(bottom)))
+    mid_x = (sx + ex) * 0.5
+    points = [(sx, sy), (mid_x, sy), (mid_x, ey), (ex, ey)]
+
+    def split(points, t):
+        (x0, y0), (x1, y1), (x2, y2), (x3, y3) = points
+        ax, ay = x0 + (x1 - x0) * t, y0 + (y1 - y0) * t
+        bx, by = x1 + (x2 - x1) * t, y1 + (y2 - y1) * t
+        cx, cy = x2 + (x3 - x2) * t, y2 + (y3 - y2) * t
+        dx, dy = ax + (bx - ax) * t, ay + (by - ay) * t
+        fx, fy = bx + (cx - bx) * t, by + (cy - by) * t
+        gx, gy = dx + (fx - dx) * t, dy + (fy - dy) * t
+        return [(x0, y0), (ax, ay), (dx, dy), (gx, gy)], [(gx, gy), (fx, fy), (cx, cy), (x3, y3)]
+
+    if t1 < 1.0:
+        points = split(points, t1)[0]
+    if t0 > 0.0:
+        points = split(points, t0 / t1)[1] if t1 > 0.0 else [points[0]] * 4
+    return [value for point in points for value in point]
+
+def paint_edges(painter, edges, top, bottom):
+    """Strokes (sx, sy, ex, ey) edges with the current pen, clipping ones far taller than `top`..`bottom`."""
+    long_edge = 2 * (bottom - top)
+    # Long edges are stroked one by one; a fan of them in one path rasterizes far slower.
+    path = QPainterPath()
+    for sx, sy, ex, ey in edges:
+        if abs(ey - sy) > long_edge:
+            points = _clip_edge(sx, sy, ex, ey, top, bottom)
+            clipped = QPainterPath(QPointF(points[0], points[1]))
+            clipped.cubicTo(*points[2:])
+            painter.drawPath(clipped)
+        else:
+            mid_x = (sx + ex) * 0.5
+            path.moveTo(sx, sy)
+            path.cubicTo(mid_x, sy, mid_x, ey, ex, ey)
+    painter.drawPath(path)
+
+class EdgeLayer(QGraphicsItem):
+    """Draws every parent-child connection from one item, indexing endpoints by a spatial hash."""
+    PEN = QPen(QColor("#666666"), 2, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin)
+
+    def __init__(self):
         super().__init__()
-        self.start_node = start_node
-        self.end_node = end_node
-        self.setPen(QPen(QColor("#666666"), 2, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin))
-        self.update_path()
-
-    def update_path(self):
-        """Recalculates and sets the cubic Bezier path based on current node positions."""
-        start_point = self.start_node.get_output_point()
-        end_point = self.end_node.get_input_point()
-        
-        path = QPainterPath()
-        path.moveTo(start_point)
-        
-        ctrl1_x = start_point.x() + (end_point.x() - start_point.x()) * 0.5
-        ctrl1_y = start_point.y()
-        ctrl2_x = ctrl1_x
-        ctrl2_y = end_point.y()
-        
-        path.cubicTo(QPointF(ctrl1_x, ctrl1_y), QPointF(ctrl2_x, ctrl2_y), end_point)
-        self.setPath(path)
+        self.setZValue(-1)
+        self.setAcceptedMouseButtons(Qt.NoButton)
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption)
+        self.slots = {}
+        self._free_slots = []
+        self._coords = array('d')
+        self._index = SpatialHash()
+        self._bounds = QRectF()
+
+    def set_bounds(self, rect):
+        """Matches the layer to the scene rect, which always encloses every edge."""
+        if rect != self._bounds:
+            self.prepareGeometryChange()
+            self._bounds = QRectF(rect)
+
+    def boundingRect(self):
+        return self._bounds
+
+    def shape(self):
+        return QPainterPath()
+
+    def _edge_rect(self, slot):
+        i = slot * 4
+        sx, sy, ex, ey = self._coords[i:i + 4]
+        return (min(sx, ex), min(sy, ey), max(sx, ex), max(sy, ey))
+
+    def _repaint(self, rect):
+        margin = self.PEN.widthF()
+        left, top, right, bottom = rect
+        self.update(QRectF(left - margin, top - margin, right - left + 2 * margin, bottom - top + 2 * margin))
+
+    def set_edge(self, node):
+        """Routes the edge from `node.parent` to `node`, adding it if needed."""
+        slot = self.slots.get(node)
+        if slot is None:
+            if self._free_slots:
+                slot = self._free_slots.pop()
+            else:
+                slot = len(self._coords) // 4
+                self._coords.extend((0.0, 0.0, 0.0, 0.0))
+            self.slots[node] = slot
+        elif slot in self._index:
+            self._repaint(self._edge_rect(slot))
+
+        i = slot * 4
+        self._coords[i:i + 2] = array('d', node.parent.get_output_point())
+        self._coords[i + 2:i + 4] = array('d', node.get_input_point())
+        if node.visible:
+            rect = self._edge_rect(slot)
+            self._index.insert(slot, rect)
+            self._repaint(rect)
+        else:
+            self._index.remove(slot)
+
+    def remove_edge(self, node):
+        slot = self.slots.pop(node, None)
+        if slot is None:
+            return
+        if slot in self._index:
+            self._repaint(self._edge_rect(slot))
+            self._index.remove(slot)
+        self._free_slots.append(slot)
+
+    def set_visible(self, node, visible):
+        slot = self.slots.get(node)
+        if slot is None or (slot in self._index) == visible:
+            return
+        rect = self._edge_rect(slot)
+        if visible:
+            self._index.insert(slot, rect)
+        else:
+            self._index.remove(slot)
+        self._repaint(rect)
+
+    def paint(self, painter, option, widget=None):
+        exposed = option.exposedRect
+        slots = self._index.query((exposed.left(), exposed.top(), exposed.right(), exposed.bottom()))
+        if not slots:
+            return
+        coords = self._coords
+        painter.setPen(self.PEN)
+        painter.setBrush(Qt.NoBrush)
+
+        scene = self.scene()
+        if scene and option.levelOfDetailFromTransform(painter.worldTransform()) < scene.lod.curves:
+            lines = []
+            for slot in slots:
+                i = slot * 4
+                lines.append(QLineF(coords[i], coords[i + 1], coords[i + 2], coords[i + 3]))
+            painter.drawLines(lines)
+            return
+
+        margin = self.PEN.widthF()
+        paint_edges(painter, (coords[slot * 4:slot * 4 + 4] for slot in slots),
+                    exposed.top() - margin, exposed.bottom() + margin)
+
+class NodeSketchLayer(QGraphicsItem):
+    """Draws the visible nodes that have no item of their own as flat rectangles."""
+    def __init__(self):
+        super().__init__()
+        self.setAcceptedMouseButtons(Qt.NoButton)
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption)
+        self._bounds = QRectF()
+
+    def set_bounds(self, rect):
+        if rect != self._bounds:
+            self.prepareGeometryChange()
+            self._bounds = QRectF(rect)
+
+    def boundingRect(self):
+        return self._bounds
+
+    def shape(self):
+        return QPainterPath()
+
+    def paint(self, painter, option, widget=None):
+        scene = self.scene()
+        exposed = option.exposedRect
+        node_items = scene.node_items
+        by_color = {}
+        marked = []
+        for node in scene.node_index.query((exposed.left(), exposed.top(), exposed.right(), exposed.bottom())):
+            if node in node_items or not node.visible:
+                continue
+            rect = QRectF(node.x, node.y, node.width, node.height)
+            by_color.setdefault(node.color, []).append(rect)
+            if node is scene.selected_node or node in scene.search_matches:
+                marked.append(rect)
+
+        painter.setPen(Qt.NoPen)
+        for color, rects in by_color.items():
+            painter.setBrush(QColor(color))
+            painter.drawRects(rects)
+        if marked:
+            painter.setPen(RoundedRectItem.STATE_PENS["selected"])
+            painter.setBrush(Qt.NoBrush)
+            painter.drawRects(marked)
+
+class NodeTextItem(QGraphicsTextItem):
+    """Node label that is skipped when zoomed out and drawn in the theme's text color."""
+    def paint(self, painter, option, widget=None):
+        scene = self.scene()
+        if not scene:
+            super().paint(painter, option, widget)
+            return
+        if option.levelOfDetailFromTransform(painter.worldTransform()) < scene.lod.text:
+            return
+        context = QAbstractTextDocumentLayout.PaintContext()
+        context.palette = scene.theme.text_palette
+        context.clip = option.exposedRect
+        self.document().documentLayout().draw(painter, context)
 
 class RoundedRectItem(QGraphicsItem):
     """Custom graphics item representing a node as a rounded rectangle."""
-    def __init__(self, x, y, width, height, radius=20, color="#3498db"):
+    # Pens and brushes are shared by every node; only the fill depends on the item.
+    STATE_PENS = {
+        "normal": QPen(QColor("#555555")),
+        "hover": QPen(QColor("#888888")),
+        "selected": QPen(QColor("#ffffff"), 2),
+    }
+    SHADOW_BRUSH = QBrush(QColor(0, 0, 0, 50))
+    BUTTON_PEN = QPen(QColor("#ffffff"))
+    # Above this zoom, cached pixmaps would get large, so nodes are painted directly.
+    MAX_PIXMAP_SCALE = 4.0
+
+    def __init__(self, x, y, width, height, radius=NODE_RADIUS, color="#3498db"):
         super().__init__()
         self.rect = QRectF(0, 0, width, height)
         self.radius = radius
         self.color = QColor(color)
+        self.brush = QBrush(self.color)
         self.setPos(x, y)
         self.setAcceptHoverEvents(True)
         self.setFlag(QGraphicsItem.ItemIsSelectable)
         self.setFlag(QGraphicsItem.ItemIsMovable)
         self.setFlag(QGraphicsItem.ItemSendsGeometryChanges)
         self.hovered = False
-        self.collapsed = False
-        self.collapse_button_rect = QRectF(width - 20, height/2 - 10, 20, 20)
+        self.highlighted = False
+        self.collapse_button_rect = collapse_button_rect(self.rect)
         self.node = None
+        self.text_item = None
+        self._paths = None
+
+    def set_size(self, width, height):
+        """Resizes the node body, e.g. after its label changed."""
+        if self.rect.width() == width and self.rect.height() == height:
+            return
+        self.prepareGeometryChange()
+        self.rect = QRectF(0, 0, width, height)
+        self.collapse_button_rect = collapse_button_rect(self.rect)
+        self._paths = None
+
+    def set_highlighted(self, highlighted):
+        """Marks the node as a search hit, drawn like a selected node without selecting it."""
+        if self.highlighted != highlighted:
+            self.highlighted = highlighted
+            self.update()
+
+    def set_color(self, color):
+        self.color = QColor(color)
+        self.brush = QBrush(self.color)
+        self.update()
 
     def boundingRect(self):
         return self.rect.adjusted(-2, -2, 2, 2)
 
     def paint(self, painter, option, widget=None):
-        painter.setRenderHint(QPainter.Antialiasing)
-        painter.setPen(Qt.NoPen)
-        painter.setBrush(QColor(0, 0, 0, 50))
-        shadow_path = QPainterPath()
-        shadow_path.addRoundedRect(self.rect.translated(2, 2), self.radius, self.radius)
-        painter.drawPath(shadow_path)
-
-        path = QPainterPath()
-        path.addRoundedRect(self.rect, self.radius, self.radius)
-        
-        if self.isSelected():
-            painter.setPen(QPen(QColor("#ffffff"), 2))
+        if self.isSelected() or self.highlighted:
+            state = "selected"
         elif self.hovered:
-            painter.setPen(QPen(QColor("#888888")))
+            state = "hover"
         else:
-            painter.setPen(QPen(QColor("#555555")))
-            
-        painter.setBrush(QBrush(self.color))
-        painter.drawPath(path)
-
+            state = "normal"
+        button = None
         if self.node and self.node.children:
-            painter.setPen(QPen(QColor("#ffffff")))
-            painter.drawRect(self.collapse_button_rect)
-            painter.drawText(self.collapse_button_rect, 
-                           Qt.AlignCenter, 
-                           "-" if not self.collapsed else "+")
+            button = "-" if not self.node.collapsed else "+"
+
+        scene = self.scene()
+        if scene and option.levelOfDetailFromTransform(painter.worldTransform()) < scene.lod.decoration:
+            painter.setPen(self.STATE_PENS["selected"] if state == "selected" else Qt.NoPen)
+            painter.setBrush(self.brush)
+            painter.drawRect(self.rect)
+            return
+        if scene and scene.node_pixmap_cache:
+            pixmap = self._cached_pixmap(painter, option, state, button)
+            if pixmap is not None:
+                painter.drawPixmap(self.boundingRect(), pixmap, QRectF(pixmap.rect()))
+                return
+        self._paint_body(painter, state, button)
+
+    def _paint_body(self, painter, state, button):
+        if self._paths is None:
+            self._paths = node_body_paths(self.rect, self.radius)
+        paint_node_body(painter, self._paths, self.brush, self.STATE_PENS[state],
+                        button, self.collapse_button_rect)
+
+    def _cached_pixmap(self, painter, option, state, button):
+        """Returns a shared pixmap of the node body for the current zoom, rendering it on a miss."""
+        scale = option.levelOfDetailFromTransform(painter.worldTransform()) * painter.device().devicePixelRatioF()
+        if scale > self.MAX_PIXMAP_SCALE:
+            return None
+        bounds = self.boundingRect()
+        key = "mindmap-node:%gx%g:%08x:%s:%s:%.3f" % (
+            bounds.width(), bounds.height(), self.color.rgba(), state, button, scale)
+        pixmap = QPixmapCache.find(key)
+        if pixmap is None or pixmap.isNull():
+            pixmap = QPixmap(max(1, math.ceil(bounds.width() * scale)), max(1, math.ceil(bounds.height() * scale)))
+            pixmap.fill(Qt.transparent)
+            pixmap_painter = QPainter(pixmap)
+            pixmap_painter.setRenderHints(painter.renderHints())
+            pixmap_painter.setFont(painter.font())
+            pixmap_painter.scale(scale, scale)
+            pixmap_painter.translate(-bounds.topLeft())
+            self._paint_body(pixmap_painter, state, button)
+            pixmap_painter.end()
+            QPixmapCache.insert(key, pixmap)
+        return pixmap
 
     def toggle_collapse(self):
-        """Toggles the collapsed state and triggers the node's update logic."""
+        """Toggles the collapsed state and updates descendant visibility."""
         if self.node and self.node.children:
-            self.collapsed = not self.collapsed
-            self.node.toggle_children(self.collapsed)
-            self.update()
+            self.scene().set_collapsed(self.node, not self.node.collapsed)
 
     def mousePressEvent(self, event):
         if self.node and self.node.children and self.collapse_button_rect.contains(event.pos()):
@@ -96,8 +391,10 @@ class RoundedRectItem(QGraphicsItem):
         if event.button() == Qt.LeftButton:
             color = QColorDialog.getColor(initial=self.color)
             if color.isValid():
-                self.color = color
-                self.update()
+                self.set_color(color)
+                if self.node:
+                    self.node.color = color.name()
+                    self.node.custom_color = True
         super().mouseDoubleClickEvent(event)
 
     def hoverEnterEvent(self, event):
@@ -113,188 +410,607 @@ class RoundedRectItem(QGraphicsItem):
             new_pos = value
             scene = self.scene()
 
-            if scene.snap_to_grid:
+            # Only user moves snap; positions applied by a layout are kept exactly.
+            if scene.snap_to_grid and not scene.applying_layout:
                 grid_size = scene.grid_size
                 snapped_x = round(value.x() / grid_size) * grid_size
                 snapped_y = round(value.y() / grid_size) * grid_size
                 snapped_pos = QPointF(snapped_x, snapped_y)
 
-                # Check for collisions at the snapped position.
-                check_rect = self.rect.translated(snapped_pos)
-                colliding_items = scene.items(check_rect)
-                
-                collision_found = False
-                for item in colliding_items:
-                    if isinstance(item, RoundedRectItem) and item is not self:
-                        collision_found = True
-                        break
-                
+                # Check for collisions with other nodes at the snapped position.
+                check_rect = (snapped_x, snapped_y,
+                              snapped_x + self.rect.width(), snapped_y + self.rect.height())
+                collision_found = any(other is not self.node and other.visible
+                                      for other in scene.node_index.query(check_rect))
                 if not collision_found:
                     new_pos = snapped_pos
             
             self.node.x = new_pos.x()
             self.node.y = new_pos.y()
-            
-            if self.node.incoming_connection:
-                self.node.incoming_connection.update_path()
-            for conn in self.node.outgoing_connections:
-                conn.update_path()
-            
-            self.scene().update()
+            scene.index_node(self.node)
+            if not scene.applying_layout:
+                self.node.user_moved = True
+                scene.update_connections(self.node)
+                scene.include_in_bounds(self.boundingRect().translated(new_pos))
             
             return new_pos
 
         return super().itemChange(change, value)
 
-class Node:
-    """Represents a node in the mind map hierarchy."""
-    WIDTH = 200
-    HEIGHT = 50
-    HORIZONTAL_SPACING = 300
-    VERTICAL_SPACING = 100
-    
-    def __init__(self, text, x, y, line_number, color="#3498db"):
-        self.text = text
-        self.x = x
-        self.y = y
-        self.width = self.WIDTH
-        self.height = self.HEIGHT
-        self.color = color
-        self.line_number = line_number
-        self.parent = None
-        self.children = []
-        self.outgoing_connections = []
-        self.incoming_connection = None
-        self.rect_item = None
-        self.text_item = None
-        self.visible = True
-        
-    def get_input_point(self):
-        return QPointF(self.x, self.y + self.height / 2)
-        
-    def get_output_point(self):
-        return QPointF(self.x + self.width, self.y + self.height / 2)
+def collapse_button_rect(rect):
+    """Returns where the collapse button sits on a node body: at its right edge, centred vertically."""
+    return QRectF(rect.right() - 20, rect.center().y() - 10, 20, 20)
 
-    def toggle_children(self, collapsed):
-        """Recursively updates the visibility of all descendant nodes."""
-        for child in self.children:
-            is_visible = not collapsed
-            
-            child.visible = is_visible
-            if child.rect_item:
-                child.rect_item.setVisible(is_visible)
-            if child.incoming_connection:
-                child.incoming_connection.setVisible(is_visible)
+def node_body_paths(rect, radius=NODE_RADIUS):
+    """Returns the (shadow, outline) paths of a node body."""
+    shadow_path = QPainterPath()
+    shadow_path.addRoundedRect(rect.translated(2, 2), radius, radius)
+    path = QPainterPath()
+    path.addRoundedRect(rect, radius, radius)
+    return shadow_path, path
 
-            child_should_hide_its_children = (not is_visible) or child.rect_item.collapsed
-            child.toggle_children(child_should_hide_its_children)
+def paint_node_body(painter, paths, brush, pen, button=None, button_rect=None):
+    """Draws a node body's shadow, outline and collapse button from its `node_body_paths`."""
+    shadow_path, path = paths
+    painter.setPen(Qt.NoPen)
+    painter.setBrush(RoundedRectItem.SHADOW_BRUSH)
+    painter.drawPath(shadow_path)
+
+    painter.setPen(pen)
+    painter.setBrush(brush)
+    painter.drawPath(path)
+
+    if button:
+        painter.setPen(RoundedRectItem.BUTTON_PEN)
+        painter.drawRect(button_rect)
+        painter.drawText(button_rect, Qt.AlignCenter, button)
 
 class MindMapScene(QGraphicsScene):
-    """Custom scene for managing mind map nodes and connections."""
+    """Custom scene projecting a `MindMapModel` into node items and one edge layer."""
     nodeSelected = Signal(object)
+    SCENE_MARGIN = 2000
+    # Released node items kept for reuse, beyond which they are simply dropped.
+    ITEM_POOL_SIZE = 2000
     
     def __init__(self):
         super().__init__()
-        self.nodes = []
-        self.level_counts = {}
-        self.setBackgroundBrush(QColor("#2a2a2a"))
+        self.model = MindMapModel()
+        self.node_items = {}
+        self.node_index = SpatialHash()
+        self.search_index = SearchIndex()
+        self.search_query = ""
+        self.search_matches = set()
+        self.search_results = []
+        self.search_position = -1
+        self.edges = EdgeLayer()
+        self.addItem(self.edges)
+        self.theme = Theme.DARK
+        self.setBackgroundBrush(self.theme.background)
         self.selected_node = None
-        self.node_text_color = QColor("#ffffff")
         self.grid_size = 20
         self.snap_to_grid = False
+        self.node_pixmap_cache = False
+        self.lazy_collapse = False
+        self.collapse_depth = None
+        self.virtualized = False
+        self.virtual_region = None
+        self.sketch_layer = None
+        self.item_pool = []
+        self.lod = LevelOfDetail()
+        self.applying_layout = False
         
     def set_snap_to_grid(self, enabled: bool):
         self.snap_to_grid = enabled
+
+    def set_lod_thresholds(self, text=None, decoration=None, curves=None):
+        """Adjusts the zoom levels below which labels, decorations and curves are dropped."""
+        if text is not None:
+            self.lod.text = text
+        if decoration is not None:
+            self.lod.decoration = decoration
+        if curves is not None:
+            self.lod.curves = curves
+        self.update()
+
+    def set_node_pixmap_cache(self, enabled: bool):
+        """Opts node bodies into shared, zoom-keyed pixmaps instead of vector repaints."""
+        self.node_pixmap_cache = enabled
+        self.update()
         
+    def set_lazy_collapse(self, enabled: bool):
+        """Switches between hiding collapsed subtrees and not materializing them at all."""
+        if enabled == self.lazy_collapse:
+            return
+        keeps_hidden = self._keeps_hidden_nodes()
+        self.lazy_collapse = enabled
+        self._sync_hidden_nodes(keeps_hidden)
+
+    def set_virtualized(self, enabled: bool):
+        """Switches to keeping node items only for the viewport region the view reports."""
+        if enabled == self.virtualized:
+            return
+        keeps_hidden = self._keeps_hidden_nodes()
+        self.virtualized = enabled
+        self._sync_hidden_nodes(keeps_hidden)
+        if enabled:
+            self.sketch_layer = NodeSketchLayer()
+            self.sketch_layer.set_bounds(self.sceneRect())
+            self.addItem(self.sketch_layer)
+        else:
+            self.removeItem(self.sketch_layer)
+            self.sketch_layer = None
+            self.virtual_region = None
+        self._sync_virtual_items()
+
+    def set_viewport_region(self, rect):
+        """Materializes items for the visible nodes overlapping `rect` (None for none) and releases the rest."""
+        self.virtual_region = QRectF(rect) if rect is not None else None
+        self._sync_virtual_items()
+
+    def _keeps_hidden_nodes(self):
+        return not (self.lazy_collapse or self.virtualized)
+
+    def _sync_hidden_nodes(self, kept_hidden):
+        """Attaches or detaches hidden nodes after the lazy or virtual mode changed."""
+        keeps_hidden = self._keeps_hidden_nodes()
+        if keeps_hidden == kept_hidden:
+            return
+        for node in self.model.nodes:
+            if node.visible:
+                continue
+            if keeps_hidden:
+                self.add_node(node)
+                self._show_items(node, False)
+            else:
+                self._detach(node)
+
+    def _sync_virtual_items(self):
+        if not self.virtualized:
+            for node in self.model.nodes:
+                if node.visible and node not in self.node_items:
+                    self._materialize(node)
+            return
+        wanted = set()
+        if self.virtual_region is not None:
+            region = self.virtual_region
+            wanted = self.node_index.query((region.left(), region.top(), region.right(), region.bottom()))
+        grabbed = self.mouseGrabberItem()
+        for node, rect_item in list(self.node_items.items()):
+            if node not in wanted and rect_item is not grabbed:
+                self._dematerialize(node)
+        for node in wanted:
+            if node.visible and node not in self.node_items:
+                self._materialize(node)
+
+    def set_collapse_depth(self, depth):
+        """Collapses nodes at or below `depth` (root is 0) when a document is first loaded; None disables it."""
+        self.collapse_depth = depth
+
     def set_theme(self, is_dark_theme: bool):
-        self.node_text_color = QColor("#ffffff") if is_dark_theme else QColor("#1e1e1e")
-        for item in self.items():
-            if isinstance(item, PySide6.QtWidgets.QGraphicsTextItem):
-                item.setDefaultTextColor(self.node_text_color)
-        self.update()
+        """Swaps the theme painters read; costs one repaint however large the map is."""
+        self.theme = Theme.DARK if is_dark_theme else Theme.LIGHT
+        self.setBackgroundBrush(self.theme.background)
         
     def clear_nodes(self):
         self.clear()
-        self.nodes = []
-        self.level_counts = {}
+        self.model = MindMapModel()
+        self.node_items = {}
+        self.item_pool = []
+        self.node_index.clear()
+        self.search_index.clear()
+        self.search_query = ""
+        self.search_matches = set()
+        self.search_results = []
+        self.search_position = -1
+        self.edges = EdgeLayer()
+        self.addItem(self.edges)
+        if self.virtualized:
+            self.sketch_layer = NodeSketchLayer()
+            self.addItem(self.sketch_layer)
         self.selected_node = None
+        self.update_index()
         self.nodeSelected.emit(None)
         
     def mousePressEvent(self, event):
         item = self.itemAt(event.scenePos(), self.views()[0].transform())
-        if isinstance(item, RoundedRectItem):
-            if self.selected_node:
-                self.selected_node.rect_item.setSelected(False)
-            self.selected_node = next((node for node in self.nodes if node.rect_item == item), None)
-            if self.selected_node:
-                item.setSelected(True)
-                self.nodeSelected.emit(self.selected_node)
+        if isinstance(item, NodeTextItem):
+            item = item.parentItem()
+        node = item.node if isinstance(item, RoundedRectItem) else None
+        if node is None and self.virtualized:
+            # Zoomed out, nodes are only sketched; pick them from the spatial hash.
+            point = event.scenePos()
+            hits = [hit for hit in self.node_index.query((point.x(), point.y(), point.x(), point.y())) if hit.visible]
+            node = max(hits, key=lambda hit: hit.line_number) if hits else None
+        if node:
+            self.select_node(node)
         super().mousePressEvent(event)
 
-    def add_node(self, node, parent=None):
-        """Adds a node with dynamic height and correctly parented text."""
-        
-        temp_text_item = self.addText(node.text, QFont("Segoe UI", 10))
-        padding = 20
-        temp_text_item.setTextWidth(node.width - padding)
-        
-        text_height = temp_text_item.boundingRect().height()
-        node.height = max(Node.HEIGHT, text_height + padding)
-        
-        self.removeItem(temp_text_item)
-        
-        node.rect_item = RoundedRectItem(node.x, node.y, node.width, node.height, color=node.color)
-        node.rect_item.node = node
-        
-        node.text_item = self.addText(node.text, QFont("Segoe UI", 10))
-        node.text_item.setDefaultTextColor(self.node_text_color)
-        node.text_item.setTextWidth(node.width - padding)
-        node.text_item.setParentItem(node.rect_item)
-        
-        text_x = (node.width - node.text_item.boundingRect().width()) / 2
-        text_y = (node.height - node.text_item.boundingRect().height()) / 2
-        node.text_item.setPos(text_x, text_y)
+    def select_node(self, node):
+        """Makes `node` the selected node, moving the item selection (or sketch highlight) with it."""
+        selected_item = self.node_items.get(self.selected_node)
+        if selected_item:
+            selected_item.setSelected(False)
+        elif self.selected_node:
+            self._repaint_node(self.selected_node)
+        self.selected_node = node
+        if node in self.node_items:
+            self.node_items[node].setSelected(True)
+        else:
+            self._repaint_node(node)
+        self.nodeSelected.emit(node)
 
-        self.addItem(node.rect_item)
-        
-        if parent:
-            parent.children.append(node)
+    def add_node(self, node):
+        """Attaches a model node to the scene, sizing it to fit its text."""
+        node.height = measure_node_height(node)
+        self.index_node(node)
+        if node.parent:
+            self.edges.set_edge(node)
+        if not self.virtualized or (self.virtual_region is not None and self.virtual_region.intersects(
+                QRectF(node.x, node.y, node.width, node.height))):
+            self._materialize(node)
+
+    def _materialize(self, node):
+        """Gives a node its rect and text items, reusing pooled ones when available."""
+        if self.item_pool:
+            rect_item = self.item_pool.pop()
+            rect_item.set_size(node.width, node.height)
+            rect_item.set_color(node.color)
+            rect_item.setPos(node.x, node.y)
+            rect_item.text_item.setPlainText(node.text)
+            rect_item.setVisible(True)
+        else:
+            rect_item = RoundedRectItem(node.x, node.y, node.width, node.height, color=node.color)
+            rect_item.text_item = NodeTextItem(node.text, rect_item)
+            rect_item.text_item.setFont(NODE_FONT)
+        rect_item.node = node
+        self._position_text(node, rect_item.text_item)
+        rect_item.set_highlighted(node in self.search_matches)
+
+        self.addItem(rect_item)
+        self.node_items[node] = rect_item
+        if node is self.selected_node:
+            rect_item.setSelected(True)
+
+    def _dematerialize(self, node):
+        """Takes a node's items out of the scene, keeping them for reuse."""
+        rect_item = self.node_items.pop(node, None)
+        if rect_item is None:
+            return
+        self.removeItem(rect_item)
+        rect_item.node = None
+        rect_item.hovered = False
+        rect_item.setSelected(False)
+        if len(self.item_pool) < self.ITEM_POOL_SIZE:
+            self.item_pool.append(rect_item)
+
+    def _repaint_node(self, node):
+        rect_item = self.node_items.get(node)
+        if rect_item:
+            rect_item.update()
+        elif self.sketch_layer:
+            self.sketch_layer.update(QRectF(node.x, node.y, node.width, node.height).adjusted(-2, -2, 2, 2))
+
+    def update_index(self):
+        """Sizes the scene rect and BSP depth to the current model."""
+        nodes = self.model.nodes
+        box = bounding_box((node.x, node.y, node.width, node.height) for node in nodes)
+        if box is None:
+            self.setSceneRect(QRectF())
+            self.edges.set_bounds(QRectF())
+            if self.sketch_layer:
+                self.sketch_layer.set_bounds(QRectF())
+            return
+        left, top, right, bottom = box
+        margin = self.SCENE_MARGIN
+        self.setSceneRect(QRectF(left - margin, top - margin,
+                                 right - left + 2 * margin, bottom - top + 2 * margin))
+        self.edges.set_bounds(self.sceneRect())
+        if self.sketch_layer:
+            self.sketch_layer.set_bounds(self.sceneRect())
+
+        depth = max(6, int(math.log2(len(nodes) * 3)) - 1)
+        if depth != self.bspTreeDepth():
+            self.setBspTreeDepth(depth)
+
+    def content_rect(self):
+        """Returns the bounding rect of the visible nodes, and so of every edge drawn between them."""
+        box = bounding_box((node.x, node.y, node.width, node.height) for node in self.model.nodes if node.visible)
+        if box is None:
+            return QRectF()
+        left, top, right, bottom = box
+        return QRectF(left, top, right - left, bottom - top).adjusted(-2, -2, 2, 2)
+
+    def include_in_bounds(self, rect):
+        """Grows the scene rect when a node is dragged past it."""
+        scene_rect = self.sceneRect()
+        if not scene_rect.contains(rect):
+            margin = self.SCENE_MARGIN
+            self.setSceneRect(scene_rect.united(rect.adjusted(-margin, -margin, margin, margin)))
+            self.edges.set_bounds(self.sceneRect())
+            if self.sketch_layer:
+                self.sketch_layer.set_bounds(self.sceneRect())
+
+    def remove_node(self, node):
+        """Removes a node that left the model, along with any items projecting it."""
+        self._detach(node)
+        self.search_index.remove(node)
+        if self.selected_node is node:
+            self.selected_node = None
+            self.nodeSelected.emit(None)
+
+    def _detach(self, node):
+        """Drops a node's scene items, edge slot and index entry, keeping the model node."""
+        self.edges.remove_edge(node)
+        self.node_index.remove(node)
+        self._dematerialize(node)
+
+    def _show_items(self, node, visible):
+        self.node_items[node].setVisible(visible)
+        self.edges.set_visible(node, visible)
+
+    def _set_node_visible(self, node, visible):
+        """Shows or hides a node, attaching or detaching it unless hidden nodes are kept."""
+        node.visible = visible
+        if self._keeps_hidden_nodes():
+            self._show_items(node, visible)
+        elif visible:
+            if node not in self.node_index:
+                self.add_node(node)
+        elif node in self.node_index:
+            self._detach(node)
+
+    def index_node(self, node):
+        """Files a node's current rect in the spatial hash used for snap collision checks."""
+        self.node_index.insert(node, (node.x, node.y, node.x + node.width, node.y + node.height))
+
+    def update_connections(self, node):
+        """Re-routes the connections attached to a node after it moved or resized."""
+        if node.parent:
+            self.edges.set_edge(node)
+        for child in node.children:
+            if child in self.edges.slots:
+                self.edges.set_edge(child)
+
+    def set_collapsed(self, node, collapsed):
+        node.collapsed = collapsed
+        self._update_visibility(node)
+        rect_item = self.node_items.get(node)
+        if rect_item:
+            rect_item.update()
+
+    def _update_visibility(self, node):
+        """Brings the descendants of `node` in line with its visibility and collapse state."""
+        stack = [node]
+        while stack:
+            parent = stack.pop()
+            visible = parent.visible and not parent.collapsed
+            for child in parent.children:
+                if child.visible != visible:
+                    self._set_node_visible(child, visible)
+                    stack.append(child)
+
+    def reconcile(self, parsed):
+        """Applies a freshly parsed and laid out model to the scene, touching only what changed."""
+        # Opening a document from scratch may start deep subtrees collapsed.
+        collapse_depth = self.collapse_depth if not self.model.nodes else None
+        old_by_key = self.model.nodes_by_key
+        matches = {}
+        claimed = set()
+        for new in parsed.nodes:
+            old = old_by_key.get(new.key)
+            if old is not None:
+                matches[new] = old
+                claimed.add(old)
+
+        old_by_line = self.model.nodes_by_line
+        for new in parsed.nodes:
+            if new in matches:
+                continue
+            old = old_by_line.get(new.line_number)
+            if old is not None and old not in claimed and old.level == new.level:
+                matches[new] = old
+                claimed.add(old)
+
+        for node in self.model.nodes:
+            if node not in claimed:
+                self.remove_node(node)
+
+        nodes = []
+        children = {}
+        touched = []
+        self.applying_layout = True
+        try:
+            for new in parsed.nodes:
+                parent = matches.get(new.parent, new.parent) if new.parent else None
+                # Parents precede children, so the parent's visibility is already settled.
+                visible = parent is None or (parent.visible and not parent.collapsed)
+                node = matches.get(new)
+                if node is None:
+                    node = new
+                    node.parent = parent
+                    if collapse_depth is not None and node.level >= collapse_depth and new.children:
+                        node.collapsed = True
+                    self.search_index.add(node)
+                    node.visible = visible
+                    if visible or self._keeps_hidden_nodes():
+                        self.add_node(node)
+                        if not visible:
+                            self._show_items(node, False)
+                else:
+                    if self._update_node(node, new, parent):
+                        touched.append(node)
+                    if node.visible != visible:
+                        self._set_node_visible(node, visible)
+                nodes.append(node)
+                children[node] = []
+                if parent:
+                    children[parent].append(node)
+        finally:
+            self.applying_layout = False
+
+        for node in nodes:
+            node.children = children[node]
+        for node in touched:
+            if node in self.node_index:
+                self.update_connections(node)
+
+        self.model = MindMapModel(nodes)
+        self.update_index()
+        if self.virtualized:
+            self._sync_virtual_items()
+            self.sketch_layer.update()
+        if self.search_query:
+            self._apply_search(self.search_query, self.search_index.search(self.search_query))
+        return self.model
+
+    def _update_node(self, node, new, parent):
+        """Brings a live node in line with its parsed counterpart; returns True if its geometry changed."""
+        node.key = new.key
+        node.line_number = new.line_number
+        node.level = new.level
+        rect_item = self.node_items.get(node)
+        geometry_changed = False
+
+        if node.text != new.text:
+            node.text = new.text
+            if rect_item:
+                rect_item.text_item.setPlainText(node.text)
+                self._layout_text(node)
+            else:
+                node.height = new.height
+            self.search_index.add(node)
+            geometry_changed = True
+
+        if not node.custom_color and node.color != new.color:
+            node.color = new.color
+            if rect_item:
+                rect_item.set_color(new.color)
+
+        if node.parent is not parent:
             node.parent = parent
-            conn = Connection(parent, node)
-            self.addItem(conn)
-            parent.outgoing_connections.append(conn)
-            node.incoming_connection = conn
-            
-        self.nodes.append(node)
+            if rect_item and parent:
+                self.edges.set_edge(node)
+            elif rect_item:
+                self.edges.remove_edge(node)
+
+        if not node.user_moved and (node.x != new.x or node.y != new.y):
+            if rect_item:
+                rect_item.setPos(new.x, new.y)
+            else:
+                node.x, node.y = new.x, new.y
+            geometry_changed = True
+        if geometry_changed and not rect_item and node in self.node_index:
+            self.index_node(node)
+        return geometry_changed
+
+    def _layout_text(self, node):
+        """Re-wraps a node's label and resizes its body to fit."""
+        rect_item = self.node_items[node]
+        node.height = measure_node_height(node)
+        rect_item.set_size(node.width, node.height)
+        self.index_node(node)
+        self._position_text(node, rect_item.text_item)
+
+    def _position_text(self, node, text_item):
+        """Wraps the label to the node width and centres it using the cached measurement."""
+        text_width = node.width - NODE_PADDING
+        text_item.setTextWidth(text_width)
+        text_height = text_measurer.text_height(node.text, text_width)
+        text_item.setPos(NODE_PADDING / 2, (node.height - text_height) / 2)
 
     def search_nodes(self, search_text):
-        if not search_text:
-            for node in self.nodes:
-                node.rect_item.setSelected(False)
-                node.rect_item.setZValue(0)
-            return
+        """Highlights the nodes whose text contains `search_text`, ignoring case."""
+        query = search_text.lower()
+        if self.search_query and self.search_query in query:
+            matches = self.search_index.search(query, within=self.search_matches)
+        else:
+            matches = self.search_index.search(query)
+        self._apply_search(query, matches)
 
-        for node in self.nodes:
-            if search_text.lower() in node.text.lower():
-                node.rect_item.setSelected(True)
-                node.rect_item.setZValue(1)
-                self._ensure_parents_visible(node)
+    def _apply_search(self, query, matches):
+        cleared = self.search_matches - matches
+        added = matches - self.search_matches
+        self.search_matches = matches
+        for node in cleared:
+            rect_item = self.node_items.get(node)
+            if rect_item:
+                rect_item.set_highlighted(False)
+            elif node.visible:
+                self._repaint_node(node)
+        for node in added:
+            self._ensure_parents_visible(node)
+            rect_item = self.node_items.get(node)
+            if rect_item:
+                rect_item.set_highlighted(True)
             else:
-                node.rect_item.setSelected(False)
-                node.rect_item.setZValue(0)
+                self._repaint_node(node)
+        self.search_query = query
+        self.search_results = sorted(matches, key=lambda node: node.line_number)
+        self.search_position = -1
+
+    def step_search_result(self, step):
+        """Moves to the next (step 1) or previous (step -1) hit in document order, wrapping around."""
+        if not self.search_results:
+            return None
+        if self.search_position < 0:
+            self.search_position = 0 if step > 0 else len(self.search_results) - 1
+        else:
+            self.search_position = (self.search_position + step) % len(self.search_results)
+        node = self.search_results[self.search_position]
+        self._ensure_parents_visible(node)
+        self.select_node(node)
+        return node
 
     def _ensure_parents_visible(self, node):
-        if node.parent:
-            if node.parent.rect_item.collapsed:
-                node.parent.rect_item.toggle_collapse()
-            self._ensure_parents_visible(node.parent)
+        collapsed = []
+        parent = node.parent
+        while parent:
+            if parent.collapsed:
+                collapsed.append(parent)
+            parent = parent.parent
+        # Expand from the top down so each step only reveals one more level.
+        for parent in reversed(collapsed):
+            self.set_collapsed(parent, False)
+
+class LayoutSignals(QObject):
+    finished = Signal(int, object)
+
+class LayoutTask(QRunnable):
+    """Parses and lays out markdown on a pool thread, tagged with the render generation it serves."""
+    def __init__(self, text, generation, layout_engine, current_generation):
+        super().__init__()
+        self.text = text
+        self.generation = generation
+        self.layout_engine = layout_engine
+        self.current_generation = current_generation
+        self.signals = LayoutSignals()
+
+    def run(self):
+        if self.current_generation() != self.generation:
+            return
+        model = parse_markdown(self.text)
+        if self.current_generation() != self.generation:
+            return
+        self.layout_engine.apply(model)
+        self.signals.finished.emit(self.generation, model)
 
 class MindMapView(QGraphicsView):
     """Custom view for displaying the mind map scene."""
+    renderFinished = Signal()
+    # The grid fades out between twice and once this spacing in device pixels.
+    GRID_FADE_START = 4
+    GRID_MAX_BUCKET = 16
+    # A virtualized scene keeps items for the viewport plus this fraction of its size on each side.
+    VIRTUAL_MARGIN = 0.5
+    # Maps with more nodes than this are virtualized, lazily collapsed and opened collapsed from this depth.
+    LARGE_MAP_NODES = 20000
+    LARGE_MAP_COLLAPSE_DEPTH = 2
+
     def __init__(self):
         super().__init__()
         self.setRenderHint(QPainter.Antialiasing)
-        self.setViewportUpdateMode(QGraphicsView.FullViewportUpdate)
+        # Moving a node only dirties its own rect and its connections' paths.
+        self.setViewportUpdateMode(QGraphicsView.MinimalViewportUpdate)
         self.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
         self.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
         self.setScene(MindMapScene())
@@ -302,31 +1018,117 @@ class MindMapView(QGraphicsView):
         self.setTransformationAnchor(QGraphicsView.AnchorUnderMouse)
         self.setResizeAnchor(QGraphicsView.AnchorUnderMouse)
         self.is_dark_theme = True
+        self.grid_tiles = {}
         self.is_panning = False
         self.last_pan_point = QPointF()
+        self.layout_engine = TidyTreeLayout(measure=measure_node_height)
+        self.render_generation = 0
+        self.layout_pool = QThreadPool(self)
+        self.layout_pool.setMaxThreadCount(1)
+        self.large_map = False
         
     def set_snap_to_grid(self, enabled: bool):
         self.scene().set_snap_to_grid(enabled)
 
+    def set_node_pixmap_cache(self, enabled: bool):
+        self.scene().set_node_pixmap_cache(enabled)
+
+    def set_lod_thresholds(self, text=None, decoration=None, curves=None):
+        self.scene().set_lod_thresholds(text, decoration, curves)
+
+    def set_lazy_collapse(self, enabled: bool):
+        self.scene().set_lazy_collapse(enabled)
+
+    def set_virtualized(self, enabled: bool):
+        self.scene().set_virtualized(enabled)
+        self.update_virtual_region(force=True)
+
+    def update_virtual_region(self, force=False):
+        """Tells a virtualized scene which region around the viewport to keep items for."""
+        scene = self.scene()
+        if scene is None or not scene.virtualized:
+            return
+        # The measure items paint by; m11 alone misses zooms that squeeze one axis.
+        if QStyleOptionGraphicsItem.levelOfDetailFromTransform(self.transform()) < scene.lod.decoration:
+            if force or scene.virtual_region is not None:
+                scene.set_viewport_region(None)
+            return
+        visible = self.mapToScene(self.viewport().rect()).boundingRect()
+        region = scene.virtual_region
+        if (not force and region is not None and region.contains(visible)
+                and region.width() * region.height() <= 16 * visible.width() * visible.height()):
+            return
+        margin_x = visible.width() * self.VIRTUAL_MARGIN
+        margin_y = visible.height() * self.VIRTUAL_MARGIN
+        scene.set_viewport_region(visible.adjusted(-margin_x, -margin_y, margin_x, margin_y))
+
+    def scrollContentsBy(self, dx, dy):
+        super().scrollContentsBy(dx, dy)
+        self.update_virtual_region()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.update_virtual_region()
+
+    def set_collapse_depth(self, depth):
+        self.scene().set_collapse_depth(depth)
+
+    def set_large_map(self, enabled: bool):
+        """Switches virtualization, lazy collapse and the collapse depth together."""
+        if enabled == self.large_map:
+            return
+        self.large_map = enabled
+        self.set_lazy_collapse(enabled)
+        self.set_collapse_depth(self.LARGE_MAP_COLLAPSE_DEPTH if enabled else None)
+        self.set_virtualized(enabled)
+
     def set_theme(self, is_dark_theme: bool):
         self.is_dark_theme = is_dark_theme
         self.scene().set_theme(is_dark_theme)
 
     def drawBackground(self, painter, rect):
         super().drawBackground(painter, rect)
+        if self.scene().virtualized:
+            # Catches transform changes that bypass the scroll and wheel hooks, e.g. fitInView.
+            QTimer.singleShot(0, self.update_virtual_region)
         grid_size = self.scene().grid_size
-        
-        left = int(rect.left()) - (int(rect.left()) % grid_size)
-        top = int(rect.top()) - (int(rect.top()) % grid_size)
-        
-        grid_color = QColor(60, 60, 60) if self.is_dark_theme else QColor(220, 220, 220)
-        pen = QPen(grid_color, 1, Qt.DotLine)
-        painter.setPen(pen)
-
-        for x in range(left, int(rect.right()), grid_size):
-            painter.drawLine(x, int(rect.top()), x, int(rect.bottom()))
-        for y in range(top, int(rect.bottom()), grid_size):
-            painter.drawLine(int(rect.left()), y, int(rect.right()), y)
+        scale = painter.worldTransform().m11() * painter.device().devicePixelRatioF()
+
+        # Fade the grid out as its spacing shrinks towards a few device pixels.
+        spacing = grid_size * scale
+        opacity = min(1.0, (spacing - self.GRID_FADE_START) / self.GRID_FADE_START)
+        if opacity <= 0:
+            return
+
+        # Tiles are rendered at the nearest quarter-octave zoom and scaled back by their pixel width.
+        bucket = min(2 ** (round(math.log2(scale) * 4) / 4), self.GRID_MAX_BUCKET)
+        theme = self.scene().theme
+        key = (theme.grid.rgba(), bucket)
+        tile = self.grid_tiles.get(key)
+        if tile is None:
+            tile = self._render_grid_tile(grid_size, bucket, theme.grid)
+            self.grid_tiles[key] = tile
+
+        brush = QBrush(tile)
+        tile_scale = grid_size / tile.width()
+        brush.setTransform(QTransform.fromScale(tile_scale, tile_scale))
+        painter.save()
+        painter.setOpacity(opacity)
+        painter.fillRect(rect, brush)
+        painter.restore()
+
+    def _render_grid_tile(self, grid_size, bucket, grid_color):
+        """Draws one grid cell (a dotted top and left edge) at the given device scale."""
+        size = max(1, round(grid_size * bucket))
+        tile = QPixmap(size, size)
+        tile.fill(Qt.transparent)
+        painter = QPainter(tile)
+        painter.scale(size / grid_size, size / grid_size)
+        painter.setPen(QPen(grid_color, 1, Qt.DotLine))
+        painter.drawLine(QPointF(0, 0.5), QPointF(grid_size, 0.5))
+        painter.drawLine(QPointF(0.5, 0), QPointF(0.5, grid_size))
+        painter.end()
+        return tile
             
     def mousePressEvent(self, event):
         if event.button() == Qt.MiddleButton:
@@ -359,57 +1161,42 @@ class MindMapView(QGraphicsView):
         if event.modifiers() & Qt.ControlModifier:
             factor = 1.1 if event.angleDelta().y() > 0 else 0.9
             self.scale(factor, factor)
+            self.update_virtual_region()
         else:
             super().wheelEvent(event)
 
-    def calculate_node_position(self, level, level_index):
-        x = level * Node.HORIZONTAL_SPACING
-        total_nodes = self.scene().level_counts.get(level, 1)
-        y = (level_index - (total_nodes - 1) / 2) * Node.VERTICAL_SPACING
-        return x, y
-
     def parse_and_render_markdown(self, text):
-        self.scene().clear_nodes()
-        self.parse_markdown_headings(text)
-        
-    def parse_markdown_headings(self, text):
-        self.scene().level_counts = {}
-        lines = text.split('\n')
-
-        # First pass: count nodes at each level for layout calculation
-        for line in lines:
-            stripped_line = line.strip()
-            if stripped_line and stripped_line.startswith('#'):
-                level = stripped_line.count('#', 0, stripped_line.find(' ')) - 1
-                self.scene().level_counts[level] = self.scene().level_counts.get(level, 0) + 1
-
-        current_levels = {}
-        level_indices = {}
-        
-        # Second pass: create and position nodes
-        for line_idx, line in enumerate(lines):
-            stripped_line = line.strip()
-            if not stripped_line or not stripped_line.startswith('#'):
-                continue
-                
-            level = stripped_line.count('#', 0, stripped_line.find(' ')) - 1
-            node_text = stripped_line.lstrip('# ').strip()
-            
-            if not node_text:
-                continue
-            
-            level_indices[level] = level_indices.get(level, -1) + 1
-                
-            x, y = self.calculate_node_position(level, level_indices[level])
-            
-            colors = ["#3498db", "#e74c3c", "#2ecc71", "#f1c40f", "#9b59b6"]
-            node = Node(node_text, x, y, line_idx, colors[level % len(colors)])
-            
-            if level == 0:
-                self.scene().add_node(node)
-            else:
-                parent = current_levels.get(level - 1)
-                if parent:
-                    self.scene().add_node(node, parent)
-                    
-            current_levels[level] = node
\ No newline at end of file
+        self._apply_model(self.layout_engine.apply(parse_markdown(text)))
+
+    def request_render(self, text):
+        """Parses and lays out `text` on the layout pool; only the scene update runs on the GUI thread."""
+        self.cancel_render()
+        task = LayoutTask(text, self.render_generation, self.layout_engine, lambda: self.render_generation)
+        task.signals.finished.connect(self._apply_render)
+        self.layout_pool.start(task)
+
+    def show_search_result(self, step):
+        """Steps through the current search hits and centres the view on the one reached."""
+        node = self.scene().step_search_result(step)
+        if node:
+            self.centerOn(node.x + node.width / 2, node.y + node.height / 2)
+
+    def cancel_render(self):
+        """Invalidates any pending render so its result is never applied."""
+        self.render_generation += 1
+        self.layout_pool.clear()
+
+    def _apply_render(self, generation, model):
+        if generation != self.render_generation:
+            return
+        self._apply_model(model)
+        self.renderFinished.emit()
+
+    def _apply_model(self, model):
+        # On before the reconcile and off after it, so no map ever gets items for every node of a large one.
+        large = len(model.nodes) > self.LARGE_MAP_NODES
+        if large:
+            self.set_large_map(True)
+        self.scene().reconcile(model)
+        if not large:
+            self.set_large_map(False)
@@ -0,0 +1,469 @@
+"""Qt-free mind map core: markdown heading tokenizer, tree model and layout."""
+import re
+from collections import namedtuple
+
+HeadingToken = namedtuple("HeadingToken", "line_number level text byte_offset")
+
+# A heading line right behind a newline; cheaper to scan for than a MULTILINE '^'.
+_HEADING_LINE = re.compile(r"\n[^\S\n]*(#[^\n]*)")
+
+def tokenize_headings(source, chunk_size=1 << 16):
+    """Yields a HeadingToken for every non-empty heading in a string or an iterable of text chunks."""
+    if isinstance(source, str):
+        document = source
+        source = (document[i:i + chunk_size] for i in range(0, len(document), chunk_size))
+    source = iter(source)
+
+    # Each buffer starts with the newline that ended the previous line.
+    carry = "\n"
+    line_number = -1
+    byte_offset = -1
+    finished = False
+    while not finished:
+        chunk = next(source, None)
+        if chunk is None:
+            finished = True
+            buffer = carry
+            end = len(buffer)
+        else:
+            buffer = carry + chunk
+            end = buffer.rfind('\n')
+            if end <= 0:
+                carry = buffer
+                continue
+
+        ascii_only = buffer.isascii()
+        pos = 0
+        for match in _HEADING_LINE.finditer(buffer, 0, end):
+            start = match.start() + 1
+            line_number += buffer.count('\n', pos, start)
+            byte_offset += (start - pos) if ascii_only else len(buffer[pos:start].encode('utf-8'))
+            pos = start
+
+            heading = match.group(1).rstrip()
+            level = heading.count('#', 0, heading.find(' ')) - 1
+            text = heading.lstrip('# ').strip()
+            if text:
+                yield HeadingToken(line_number, level, text, byte_offset)
+
+        line_number += buffer.count('\n', pos, end)
+        byte_offset += (end - pos) if ascii_only else len(buffer[pos:end].encode('utf-8'))
+        carry = buffer[end:]
+
+class Node:
+    """Represents a node in the mind map hierarchy."""
+    # Slots keep per-node geometry compact for very large maps.
+    __slots__ = ("text", "level", "key", "x", "y", "width", "height", "color", "line_number",
+                 "parent", "children", "visible", "collapsed", "user_moved", "custom_color",
+                 "__weakref__")
+    WIDTH = 200
+    HEIGHT = 50
+    HORIZONTAL_SPACING = 300
+    LEVEL_COLORS = ["#3498db", "#e74c3c", "#2ecc71", "#f1c40f", "#9b59b6"]
+
+    def __init__(self, text, x, y, line_number, color="#3498db", level=0, key=None):
+        self.text = text
+        self.level = level
+        self.key = key
+        self.x = x
+        self.y = y
+        self.width = self.WIDTH
+        self.height = self.HEIGHT
+        self.color = color
+        self.line_number = line_number
+        self.parent = None
+        self.children = []
+        self.visible = True
+        self.collapsed = False
+        self.user_moved = False
+        self.custom_color = False
+
+    def get_input_point(self):
+        return self.x, self.y + self.height / 2
+
+    def get_output_point(self):
+        return self.x + self.width, self.y + self.height / 2
+
+    def path(self):
+        """Returns the heading texts from the root down to this node."""
+        texts = []
+        node = self
+        while node:
+            texts.append(node.text)
+            node = node.parent
+        return texts[::-1]
+
+class MindMapModel:
+    """A tree of `Node`s in document order, indexed by heading-path key and source line."""
+    def __init__(self, nodes=None):
+        self.nodes = nodes if nodes is not None else []
+        self.nodes_by_key = {node.key: node for node in self.nodes}
+        self.nodes_by_line = {node.line_number: node for node in self.nodes}
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def roots(self):
+        return [node for node in self.nodes if node.parent is None]
+
+class SpatialHash:
+    """Hierarchical grid of buckets mapping keys to (left, top, right, bottom) rects."""
+    def __init__(self, cell_size=256):
+        self.cell_size = cell_size
+        self._levels = {}
+        self._rects = {}
+
+    def __len__(self):
+        return len(self._rects)
+
+    def __contains__(self, key):
+        return key in self._rects
+
+    def _level_for(self, extent):
+        level = 0
+        size = self.cell_size
+        while size < extent:
+            size *= 2
+            level += 1
+        return level
+
+    def _cell_span(self, rect, level):
+        left, top, right, bottom = rect
+        width = self.cell_size << level[0]
+        height = self.cell_size << level[1]
+        return int(left // width), int(top // height), int(right // width), int(bottom // height)
+
+    def insert(self, key, rect):
+        """Files `key` under `rect`, replacing any rect it had before."""
+        old = self._rects.get(key)
+        if old is not None:
+            if old[0] == rect:
+                return
+            self.remove(key)
+        left, top, right, bottom = rect
+        level = (self._level_for(right - left), self._level_for(bottom - top))
+        self._rects[key] = (rect, level)
+        cells = self._levels.setdefault(level, {})
+        x0, y0, x1, y1 = self._cell_span(rect, level)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket is None:
+                    cells[(cx, cy)] = {key}
+                else:
+                    bucket.add(key)
+
+    def remove(self, key):
+        entry = self._rects.pop(key, None)
+        if entry is None:
+            return
+        rect, level = entry
+        cells = self._levels[level]
+        x0, y0, x1, y1 = self._cell_span(rect, level)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket is not None:
+                    bucket.discard(key)
+                    if not bucket:
+                        del cells[(cx, cy)]
+        if not cells:
+            del self._levels[level]
+
+    def clear(self):
+        self._levels.clear()
+        self._rects.clear()
+
+    def query(self, rect):
+        """Returns the set of keys whose rects overlap `rect`."""
+        left, top, right, bottom = rect
+        candidates = set()
+        for level, cells in self._levels.items():
+            x0, y0, x1, y1 = self._cell_span(rect, level)
+            if (x1 - x0 + 1) * (y1 - y0 + 1) > len(cells):
+                # The query covers more cells than are occupied; walk those instead.
+                for (cx, cy), bucket in cells.items():
+                    if x0 <= cx <= x1 and y0 <= cy <= y1:
+                        candidates.update(bucket)
+            else:
+                for cx in range(x0, x1 + 1):
+                    for cy in range(y0, y1 + 1):
+                        bucket = cells.get((cx, cy))
+                        if bucket:
+                            candidates.update(bucket)
+        rects = self._rects
+        found = set()
+        for key in candidates:
+            r = rects[key][0]
+            if r[0] <= right and r[2] >= left and r[1] <= bottom and r[3] >= top:
+                found.add(key)
+        return found
+
+def bounding_box(rows):
+    """Returns (left, top, right, bottom) around (x, y, width, height) rows, or None for no rows."""
+    left = top = float('inf')
+    right = bottom = float('-inf')
+    for x, y, width, height in rows:
+        if x < left:
+            left = x
+        if y < top:
+            top = y
+        if x + width > right:
+            right = x + width
+        if y + height > bottom:
+            bottom = y + height
+    if left > right:
+        return None
+    return left, top, right, bottom
+
+class SearchIndex:
+    """Case-insensitive substring search over node text, backed by a trigram index."""
+    def __init__(self):
+        self._texts = {}
+        self._postings = {}
+        self._pending = set()
+
+    def __len__(self):
+        self._flush()
+        return len(self._texts)
+
+    @staticmethod
+    def _trigrams(text):
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    def add(self, node):
+        """Queues `node` to be (re-)indexed under its current text."""
+        self._pending.add(node)
+
+    def remove(self, node):
+        self._pending.discard(node)
+        self._unindex(node)
+
+    def clear(self):
+        self._texts.clear()
+        self._postings.clear()
+        self._pending.clear()
+
+    def _flush(self):
+        pending = self._pending
+        self._pending = set()
+        postings = self._postings
+        for node in pending:
+            text = node.text.lower()
+            if self._texts.get(node) == text:
+                continue
+            self._unindex(node)
+            self._texts[node] = text
+            for trigram in self._trigrams(text):
+                nodes = postings.get(trigram)
+                if nodes is None:
+                    postings[trigram] = {node}
+                else:
+                    nodes.add(node)
+
+    def _unindex(self, node):
+        text = self._texts.pop(node, None)
+        if text is None:
+            return
+        postings = self._postings
+        for trigram in self._trigrams(text):
+            nodes = postings[trigram]
+            nodes.discard(node)
+            if not nodes:
+                del postings[trigram]
+
+    def search(self, query, within=None):
+        """Returns the set of indexed nodes whose text contains `query`, ignoring case."""
+        query = query.lower()
+        if not query:
+            return set()
+        self._flush()
+        texts = self._texts
+        if within is not None:
+            candidates = within
+        elif len(query) < 3:
+            candidates = texts
+        else:
+            postings = [self._postings.get(trigram) for trigram in self._trigrams(query)]
+            if not all(postings):
+                return set()
+            postings.sort(key=len)
+            candidates = postings[0].intersection(*postings[1:])
+        return {node for node in candidates if query in texts.get(node, "")}
+
+def parse_markdown(source):
+    """Builds an unpositioned `MindMapModel` from the markdown headings in `source`."""
+    colors = Node.LEVEL_COLORS
+    current_levels = {}
+    sibling_counts = {}
+    nodes = []
+
+    for line_number, level, node_text, _ in tokenize_headings(source):
+        parent = current_levels.get(level - 1) if level > 0 else None
+        if level > 0 and not parent:
+            current_levels[level] = None
+            continue
+
+        parent_key = parent.key if parent else None
+        occurrence = sibling_counts.get((parent_key, node_text), 0)
+        sibling_counts[(parent_key, node_text)] = occurrence + 1
+
+        node = Node(node_text, 0, 0, line_number, colors[level % len(colors)],
+                    level=level, key=(parent_key, node_text, occurrence))
+        if parent:
+            node.parent = parent
+            parent.children.append(node)
+        nodes.append(node)
+        current_levels[level] = node
+
+    return MindMapModel(nodes)
+
+def merge_heading_trees(documents, title=None):
+    """Merges markdown heading trees under a single `#` root, combining same-named siblings."""
+    # Each entry is [text, entries by folded text, ordered child entries].
+    root = [title, {}, []]
+    for document in documents:
+        for node in parse_markdown(document).nodes:
+            if node.level:
+                continue
+            if root[0] is None:
+                root[0] = node.text
+            stack = [(root, child) for child in reversed(node.children)]
+            while stack:
+                target, child = stack.pop()
+                folded = child.text.casefold()
+                entry = target[1].get(folded)
+                if entry is None:
+                    entry = target[1][folded] = [child.text, {}, []]
+                    target[2].append(entry)
+                stack.extend((entry, grandchild) for grandchild in reversed(child.children))
+
+    if root[0] is None:
+        return ""
+    lines = []
+    stack = [(root, 1)]
+    while stack:
+        entry, depth = stack.pop()
+        lines.append("#" * depth + " " + entry[0])
+        stack.extend((child, depth + 1) for child in reversed(entry[2]))
+    return "\n".join(lines) + "\n"
+
+class TidyTreeLayout:
+    """Linear-time tidy tree layout (Buchheim, Juenger and Leipert's take on Walker)."""
+    SIBLING_SPACING = 20
+    SUBTREE_SPACING = 40
+
+    def __init__(self, measure=None):
+        self.measure = measure
+
+    def apply(self, model):
+        nodes = model.nodes
+        if not nodes:
+            return model
+        if self.measure:
+            for node in nodes:
+                node.height = self.measure(node)
+
+        # Work on flat per-index arrays; index n is a virtual root over the forest.
+        n = len(nodes)
+        root = n
+        index = {node: i for i, node in enumerate(nodes)}
+        parent = [index[node.parent] if node.parent else root for node in nodes] + [-1]
+        children = [[index[child] for child in node.children] for node in nodes]
+        children.append([i for i in range(n) if parent[i] == root])
+        height = [node.height for node in nodes] + [0]
+        number = [0] * (n + 1)
+        for kids in children:
+            for position, child in enumerate(kids):
+                number[child] = position
+
+        prelim = [0.0] * (n + 1)
+        mod = [0.0] * (n + 1)
+        shift = [0.0] * (n + 1)
+        change = [0.0] * (n + 1)
+        midpoint = [0.0] * (n + 1)
+        thread = [-1] * (n + 1)
+        ancestor = list(range(n + 1))
+
+        def distance(a, b):
+            gap = self.SIBLING_SPACING if parent[a] == parent[b] else self.SUBTREE_SPACING
+            return (height[a] + height[b]) / 2 + gap
+
+        def next_top(v):
+            return children[v][0] if children[v] else thread[v]
+
+        def next_bottom(v):
+            return children[v][-1] if children[v] else thread[v]
+
+        def move_subtree(wl, wr, amount):
+            subtrees = number[wr] - number[wl]
+            change[wr] -= amount / subtrees
+            shift[wr] += amount
+            change[wl] += amount / subtrees
+            prelim[wr] += amount
+            mod[wr] += amount
+
+        def apportion(v, default_ancestor):
+            siblings = children[parent[v]]
+            vir = vor = v
+            vil = siblings[number[v] - 1]
+            vol = siblings[0]
+            sir = sor = mod[vir]
+            sil = mod[vil]
+            sol = mod[vol]
+            while next_bottom(vil) != -1 and next_top(vir) != -1:
+                vil = next_bottom(vil)
+                vir = next_top(vir)
+                vol = next_top(vol)
+                vor = next_bottom(vor)
+                ancestor[vor] = v
+                amount = (prelim[vil] + sil) - (prelim[vir] + sir) + distance(vil, vir)
+                if amount > 0:
+                    a = ancestor[vil]
+                    move_subtree(a if parent[a] == parent[v] else default_ancestor, v, amount)
+                    sir += amount
+                    sor += amount
+                sil += mod[vil]
+                sir += mod[vir]
+                sol += mod[vol]
+                sor += mod[vor]
+            if next_bottom(vil) != -1 and next_bottom(vor) == -1:
+                thread[vor] = next_bottom(vil)
+                mod[vor] += sil - sor
+            if next_top(vir) != -1 and next_top(vol) == -1:
+                thread[vol] = next_top(vir)
+                mod[vol] += sir - sol
+                default_ancestor = v
+            return default_ancestor
+
+        # First walk: model order is a pre-order, so backwards finishes every subtree before its parent.
+        for v in list(range(n - 1, -1, -1)) + [root]:
+            kids = children[v]
+            if not kids:
+                continue
+            default_ancestor = kids[0]
+            for position, w in enumerate(kids):
+                if position:
+                    prelim[w] = prelim[kids[position - 1]] + distance(kids[position - 1], w)
+                    if children[w]:
+                        mod[w] = prelim[w] - midpoint[w]
+                    default_ancestor = apportion(w, default_ancestor)
+                else:
+                    prelim[w] = midpoint[w]
+            amount = total = 0.0
+            for w in reversed(kids):
+                prelim[w] += amount
+                mod[w] += amount
+                total += change[w]
+                amount += shift[w] + total
+            midpoint[v] = (prelim[kids[0]] + prelim[kids[-1]]) / 2
+
+        # Second walk, in pre-order: accumulate ancestor modifiers into final centres.
+        offset = [0.0] * (n + 1)
+        offset[root] = -midpoint[root]
+        for i, node in enumerate(nodes):
+            p = parent[i]
+            offset[i] = offset[p] + mod[p]
+            node.x = node.level * Node.HORIZONTAL_SPACING
+            node.y = prelim[i] + offset[i] - height[i] / 2
+        return model
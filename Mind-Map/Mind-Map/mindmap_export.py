@@ -0,0 +1,510 @@
+import math
+import os
+import queue
+import struct
+import threading
+import zlib
+from xml.sax.saxutils import escape
+
+from PySide6.QtGui import (QPainter, QImage, QColor, QBrush, QPalette, QTextDocument,
+                           QAbstractTextDocumentLayout, QPdfWriter, QPageSize, QPageLayout, QFont, QFontInfo,
+                           QFontMetricsF, QGuiApplication)
+from PySide6.QtCore import Qt, QRectF, QMarginsF, QObject, Signal
+
+from mindmap_core import SpatialHash, bounding_box
+from graphics_items import (NODE_FONT, NODE_PADDING, EdgeLayer, RoundedRectItem, collapse_button_rect,
+                            node_body_paths, paint_edges, paint_node_body)
+
+class MapSnapshot:
+    """Frozen copy of the visible map that exporters can draw on any thread."""
+    def __init__(self, model, theme):
+        self.background = QColor(theme.background)
+        self.node_text = QColor(theme.node_text)
+        self.button_font = button_font()
+        screen = QGuiApplication.primaryScreen()
+        self.dpi = screen.logicalDotsPerInchY() if screen else 96
+        self.nodes = []
+        self.edges = []
+        self.node_index = SpatialHash()
+        self.edge_index = SpatialHash()
+
+        for node in model.nodes:
+            if not node.visible:
+                continue
+            button = None
+            if node.children:
+                button = "+" if node.collapsed else "-"
+            self.node_index.insert(len(self.nodes), (node.x, node.y, node.x + node.width, node.y + node.height))
+            self.nodes.append((node.x, node.y, node.width, node.height, node.color, node.text, button))
+            if node.parent:
+                sx, sy = node.parent.get_output_point()
+                ex, ey = node.get_input_point()
+                self.edge_index.insert(len(self.edges), (min(sx, ex), min(sy, ey), max(sx, ex), max(sy, ey)))
+                self.edges.append((sx, sy, ex, ey))
+
+    def bounds(self):
+        """Returns the rect covering every node (and so every edge), like `MindMapScene.content_rect`."""
+        box = bounding_box(node[:4] for node in self.nodes)
+        if box is None:
+            return QRectF()
+        left, top, right, bottom = box
+        return QRectF(left, top, right - left, bottom - top).adjusted(-2, -2, 2, 2)
+
+def layout_label(document, text, width):
+    """Lays `text` out in `document` like a node label; returns its left offset and height."""
+    document.setTextWidth(width - NODE_PADDING)
+    document.setPlainText(text)
+    return NODE_PADDING / 2, document.size().height()
+
+def button_font():
+    """Returns the application font sized in pixels, for collapse-button glyphs on any device."""
+    font = QFont(QGuiApplication.font())
+    font.setPixelSize(QFontInfo(font).pixelSize())
+    return font
+
+class MapPainter:
+    """Draws a region of a `MapSnapshot` the way the scene draws the map at full detail."""
+    MARGIN = 4
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.text_palette = QPalette()
+        self.text_palette.setColor(QPalette.Text, snapshot.node_text)
+        self.document = QTextDocument()
+        self.document.setDefaultFont(NODE_FONT)
+        self.button_font = snapshot.button_font
+
+    def paint(self, painter, rect):
+        """Fills `rect` (in scene coordinates) with the background and draws what intersects it."""
+        snapshot = self.snapshot
+        painter.fillRect(rect, snapshot.background)
+        # Node shadows and pens reach a few units past the rects they are indexed by.
+        margin = self.MARGIN
+        query = (rect.left() - margin, rect.top() - margin, rect.right() + margin, rect.bottom() + margin)
+
+        edges = sorted(snapshot.edge_index.query(query))
+        if edges:
+            painter.setPen(EdgeLayer.PEN)
+            painter.setBrush(Qt.NoBrush)
+            paint_edges(painter, (snapshot.edges[i] for i in edges), query[1], query[3])
+
+        painter.setFont(self.button_font)
+        for i in sorted(snapshot.node_index.query(query)):
+            self._paint_node(painter, *snapshot.nodes[i])
+
+    def _paint_node(self, painter, x, y, width, height, color, text, button):
+        body = QRectF(x, y, width, height)
+        paint_node_body(painter, node_body_paths(body), QBrush(QColor(color)), RoundedRectItem.STATE_PENS["normal"],
+                        button, collapse_button_rect(body))
+
+        left, text_height = layout_label(self.document, text, width)
+        context = QAbstractTextDocumentLayout.PaintContext()
+        context.palette = self.text_palette
+        painter.save()
+        painter.translate(x + left, y + (height - text_height) / 2)
+        self.document.documentLayout().draw(painter, context)
+        painter.restore()
+
+class PngWriter:
+    """Streams an 8-bit RGBA PNG to disk a band of rows at a time."""
+    CHUNK_SIZE = 1 << 16
+
+    def __init__(self, file_name, width, height):
+        self.width = width
+        self.height = height
+        self.rows_written = 0
+        self._file = open(file_name, 'wb')
+        self._compressor = zlib.compressobj(6)
+        self._pending = []
+        self._pending_size = 0
+        self._file.write(b'\x89PNG\r\n\x1a\n')
+        self._write_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0))
+
+    def write_rows(self, data, rows, stride):
+        """Appends `rows` rows of RGBA pixels taken from `data`, `stride` bytes apart."""
+        row_bytes = self.width * 4
+        data = memoryview(data)
+        # Filter type 0 (None) on every row; deflate does the work.
+        filtered = b''.join(b'\0' + data[start:start + row_bytes] for start in range(0, rows * stride, stride))
+        self._deflate(self._compressor.compress(filtered))
+        self.rows_written += rows
+
+    def close(self):
+        """Finishes the image; fails if fewer rows than announced were written."""
+        try:
+            if self.rows_written != self.height:
+                raise ValueError(f"PNG has {self.rows_written} of {self.height} rows")
+            self._deflate(self._compressor.flush())
+            self._flush_idat()
+            self._write_chunk(b'IEND', b'')
+        finally:
+            self._file.close()
+
+    def abort(self):
+        self._file.close()
+
+    def _deflate(self, data):
+        if data:
+            self._pending.append(data)
+            self._pending_size += len(data)
+            if self._pending_size >= self.CHUNK_SIZE:
+                self._flush_idat()
+
+    def _flush_idat(self):
+        if self._pending:
+            self._write_chunk(b'IDAT', b''.join(self._pending))
+            self._pending = []
+            self._pending_size = 0
+
+    def _write_chunk(self, kind, payload):
+        self._file.write(struct.pack('>I', len(payload)))
+        self._file.write(kind)
+        self._file.write(payload)
+        self._file.write(struct.pack('>I', zlib.crc32(payload, zlib.crc32(kind)) & 0xffffffff))
+
+class PngExporter:
+    """Tiled PNG export whose memory use stays under `memory_limit` however large the map is."""
+    def __init__(self, scale=1.0, max_dimension=None, tile_size=1024, memory_limit=64 * 1024 * 1024):
+        self.scale = scale
+        self.max_dimension = max_dimension
+        self.tile_size = tile_size
+        self.memory_limit = memory_limit
+
+    def output_scale(self, source):
+        """Returns the scale actually used for a source rect, after the max-dimension limit."""
+        scale = self.scale
+        if self.max_dimension:
+            longest = max(source.width(), source.height()) * scale
+            if longest > self.max_dimension:
+                scale *= self.max_dimension / longest
+        return scale
+
+    def export(self, snapshot, file_name, progress=None):
+        """Writes `snapshot` to `file_name`, calling progress(done, total); returns the image size."""
+        source = snapshot.bounds()
+        scale = self.output_scale(source)
+        width = max(1, math.ceil(source.width() * scale))
+        height = max(1, math.ceil(source.height() * scale))
+        band_height = max(1, min(self.tile_size, self.memory_limit // (width * 4)))
+        bands = math.ceil(height / band_height)
+
+        painter_helper = MapPainter(snapshot)
+        band = bytearray(width * 4 * band_height) if width > self.tile_size else None
+        writer = PngWriter(file_name, width, height)
+        try:
+            for index in range(bands):
+                top = index * band_height
+                rows = min(band_height, height - top)
+                if band is None:
+                    # One tile spans the whole width; stream it straight from the image.
+                    tile = self._render_tile(painter_helper, source, scale, 0, top, width, rows)
+                    writer.write_rows(tile.constBits(), rows, tile.bytesPerLine())
+                else:
+                    for left in range(0, width, self.tile_size):
+                        columns = min(self.tile_size, width - left)
+                        tile = self._render_tile(painter_helper, source, scale, left, top, columns, rows)
+                        bits = tile.constBits()
+                        stride = tile.bytesPerLine()
+                        for row in range(rows):
+                            start = row * stride
+                            offset = (row * width + left) * 4
+                            band[offset:offset + columns * 4] = bits[start:start + columns * 4]
+                    writer.write_rows(band, rows, width * 4)
+                if progress:
+                    progress(index + 1, bands)
+            writer.close()
+        except BaseException:
+            writer.abort()
+            raise
+        return width, height
+
+    def _render_tile(self, painter_helper, source, scale, left, top, columns, rows):
+        tile = QImage(columns, rows, QImage.Format_RGBA8888)
+        tile.fill(Qt.transparent)
+        painter = QPainter(tile)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.translate(-left, -top)
+        painter.scale(scale, scale)
+        painter.translate(-source.left(), -source.top())
+        region = QRectF(source.left() + left / scale, source.top() + top / scale, columns / scale, rows / scale)
+        painter_helper.paint(painter, region)
+        painter.end()
+        return tile
+
+def _number(value):
+    """Formats a coordinate for SVG output with at most two decimals."""
+    value = round(value, 2)
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+class SvgExporter:
+    """Writes a map as SVG, one element at a time, straight from a `MapSnapshot`."""
+    PROGRESS_STEP = 1000
+
+    def export(self, snapshot, file_name, progress=None):
+        """Writes `snapshot` to `file_name`, calling progress(done, total) as nodes are written."""
+        bounds = snapshot.bounds()
+        document = QTextDocument()
+        document.setDefaultFont(NODE_FONT)
+        metrics = QFontMetricsF(snapshot.button_font)
+        button_baseline = (metrics.ascent() - metrics.descent()) / 2
+        total = len(snapshot.nodes)
+
+        with open(file_name, 'w', encoding='utf-8') as out:
+            view_box = " ".join(_number(v) for v in (bounds.left(), bounds.top(), bounds.width(), bounds.height()))
+            out.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+            out.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{_number(bounds.width())}" '
+                      f'height="{_number(bounds.height())}" viewBox="{view_box}">\n')
+            out.write('<style>\n'
+                      f'.e{{fill:none;stroke:{EdgeLayer.PEN.color().name()};stroke-width:{_number(EdgeLayer.PEN.widthF())}}}\n'
+                      f'.s{{fill:#000000;fill-opacity:{_number(RoundedRectItem.SHADOW_BRUSH.color().alphaF())}}}\n'
+                      f'.n{{stroke:{RoundedRectItem.STATE_PENS["normal"].color().name()}}}\n'
+                      f'.b{{fill:none;stroke:{RoundedRectItem.BUTTON_PEN.color().name()}}}\n'
+                      f'.t{{{self._font_style(snapshot.button_font, snapshot.dpi)};fill:{RoundedRectItem.BUTTON_PEN.color().name()};'
+                      'text-anchor:middle}\n'
+                      f'.l{{{self._font_style(NODE_FONT, snapshot.dpi)};fill:{snapshot.node_text.name()}}}\n'
+                      '</style>\n')
+            out.write(f'<rect x="{_number(bounds.left())}" y="{_number(bounds.top())}" width="{_number(bounds.width())}" '
+                      f'height="{_number(bounds.height())}" fill="{snapshot.background.name()}"/>\n')
+
+            out.write('<g class="e">\n')
+            for sx, sy, ex, ey in snapshot.edges:
+                mid_x = _number((sx + ex) * 0.5)
+                sx, sy, ex, ey = _number(sx), _number(sy), _number(ex), _number(ey)
+                out.write(f'<path d="M{sx} {sy}C{mid_x} {sy} {mid_x} {ey} {ex} {ey}"/>\n')
+            out.write('</g>\n')
+
+            for done, node in enumerate(snapshot.nodes, 1):
+                out.write(self._node_element(document, node, button_baseline))
+                if progress and (done % self.PROGRESS_STEP == 0 or done == total):
+                    progress(done, total)
+            out.write('</svg>\n')
+
+    @staticmethod
+    def _font_style(font, dpi):
+        size = font.pixelSize()
+        if size <= 0:
+            # Point sizes are converted at the resolution Qt laid the labels out at.
+            size = font.pointSizeF() * dpi / 72
+        return f"font-family:'{font.family()}';font-size:{_number(size)}px"
+
+    def _node_element(self, document, node, button_baseline):
+        x, y, width, height, color, text, button = node
+        parts = [f'<g transform="translate({_number(x)} {_number(y)})">'
+                 f'<rect class="s" x="2" y="2" width="{_number(width)}" height="{_number(height)}" rx="20"/>'
+                 f'<rect class="n" width="{_number(width)}" height="{_number(height)}" rx="20" '
+                 f'fill="{QColor(color).name()}"/>']
+        if button:
+            button_x = width - 20
+            button_y = height / 2 - 10
+            parts.append(f'<rect class="b" x="{_number(button_x)}" y="{_number(button_y)}" width="20" height="20"/>'
+                         f'<text class="t" x="{_number(button_x + 10)}" '
+                         f'y="{_number(button_y + 10 + button_baseline)}">{button}</text>')
+
+        left, text_height = layout_label(document, text, width)
+        top = (height - text_height) / 2
+        block = document.begin()
+        while block.isValid():
+            layout = block.layout()
+            origin = layout.position()
+            block_text = block.text()
+            for i in range(layout.lineCount()):
+                line = layout.lineAt(i)
+                line_text = block_text[line.textStart():line.textStart() + line.textLength()].rstrip()
+                if line_text:
+                    parts.append(f'<text class="l" x="{_number(left + origin.x() + line.x())}" '
+                                 f'y="{_number(top + origin.y() + line.y() + line.ascent())}">{escape(line_text)}</text>')
+            block = block.next()
+        parts.append('</g>\n')
+        return ''.join(parts)
+
+class PdfExporter:
+    """Writes a map as a multi-page vector PDF, drawing one page at a time."""
+    def __init__(self, page_size=QPageSize.A4, orientation=QPageLayout.Portrait, margin_mm=10, scale=1.0,
+                 fit_width=True, resolution=300):
+        self.page_size = page_size
+        self.orientation = orientation
+        self.margin_mm = margin_mm
+        self.scale = scale
+        self.fit_width = fit_width
+        self.resolution = resolution
+
+    def export(self, snapshot, file_name, progress=None):
+        """Writes `snapshot` to `file_name`, calling progress(done, total); returns the page count."""
+        writer = QPdfWriter(file_name)
+        writer.setResolution(self.resolution)
+        writer.setPageLayout(QPageLayout(QPageSize(self.page_size), self.orientation,
+                                         QMarginsF(*(self.margin_mm,) * 4), QPageLayout.Millimeter))
+        writer.setCreator("Tree-Graph MindMap")
+
+        bounds = snapshot.bounds()
+        page = QRectF(writer.pageLayout().paintRectPixels(self.resolution))
+        factor = self.resolution / 96 * self.scale
+        if self.fit_width and bounds.width() * factor > page.width():
+            factor = page.width() / bounds.width()
+        page_width = page.width() / factor
+        page_height = page.height() / factor
+        columns = max(1, math.ceil(bounds.width() / page_width - 1e-9))
+        rows = max(1, math.ceil(bounds.height() / page_height - 1e-9))
+        margin = MapPainter.MARGIN
+
+        painter = QPainter()
+        if not painter.begin(writer):
+            raise OSError(f"Cannot write to {file_name}")
+        painter.setRenderHint(QPainter.Antialiasing)
+        map_painter = MapPainter(snapshot)
+        pages = 0
+        try:
+            for row in range(rows):
+                for column in range(columns):
+                    region = QRectF(bounds.left() + column * page_width, bounds.top() + row * page_height,
+                                    page_width, page_height).intersected(bounds)
+                    query = (region.left() - margin, region.top() - margin,
+                             region.right() + margin, region.bottom() + margin)
+                    if snapshot.node_index.query(query) or snapshot.edge_index.query(query):
+                        if pages and not writer.newPage():
+                            raise OSError(f"Cannot write to {file_name}")
+                        painter.save()
+                        painter.scale(factor, factor)
+                        painter.translate(-region.left(), -region.top())
+                        painter.setClipRect(region)
+                        map_painter.paint(painter, region)
+                        painter.restore()
+                        pages += 1
+                    if progress:
+                        progress(row * columns + column + 1, rows * columns)
+        finally:
+            painter.end()
+        return pages
+
+class ExportCancelled(Exception):
+    """Raised inside the export service when the job it is running has been cancelled."""
+
+class ExportJob:
+    """One export queued on the export service: a snapshot and its (format, file name) targets."""
+    def __init__(self, job_id, snapshot, targets):
+        self.id = job_id
+        self.snapshot = snapshot
+        self.targets = targets
+        self.cancelled = threading.Event()
+        self.percent = -1
+
+class ExportService(QObject):
+    """Long-lived service that writes exports off the GUI thread, one job at a time."""
+    started = Signal(int)
+    progress = Signal(int, int)
+    finished = Signal(int, list)
+    error = Signal(int, str)
+    cancelled = Signal(int)
+
+    # Emitted from the service thread, tagged with the id of the job they report on.
+    _job_started = Signal(int)
+    _progress_made = Signal(int, int)
+    _job_finished = Signal(int, list)
+    _error_raised = Signal(int, str)
+
+    def __init__(self, exporters, parent=None):
+        super().__init__(parent)
+        self.exporters = exporters
+        self.jobs = {}
+        self._next_id = 0
+        self._queue = queue.Queue()
+        self._job_started.connect(self._relay_started)
+        self._progress_made.connect(self._relay_progress)
+        self._job_finished.connect(self._relay_finished)
+        self._error_raised.connect(self._relay_error)
+        self._thread = threading.Thread(target=self._serve, name="ExportService", daemon=True)
+        self._thread.start()
+
+    def is_busy(self):
+        return bool(self.jobs)
+
+    def submit(self, snapshot, targets):
+        """Queues writing `snapshot` to each (format, file name) in `targets` and returns the job id."""
+        for kind, _ in targets:
+            if kind not in self.exporters:
+                raise ValueError(f"Unknown export format: {kind}")
+        self._next_id += 1
+        job = ExportJob(self._next_id, snapshot, list(targets))
+        self.jobs[job.id] = job
+        self._queue.put(job)
+        return job.id
+
+    def cancel(self, job_id=None):
+        """Cancels one job, or every unfinished job without an id, emitting `cancelled` for each."""
+        job_ids = list(self.jobs) if job_id is None else [job_id]
+        for job_id in job_ids:
+            job = self.jobs.pop(job_id, None)
+            if job is not None:
+                job.cancelled.set()
+                self.cancelled.emit(job_id)
+
+    def shutdown(self):
+        """Cancels pending work and waits for the service thread to stop writing."""
+        for job in self.jobs.values():
+            job.cancelled.set()
+        self.jobs.clear()
+        self._queue.put(None)
+        self._thread.join()
+
+    # --- GUI thread ---
+
+    def _relay_started(self, job_id):
+        if job_id in self.jobs:
+            self.started.emit(job_id)
+
+    def _relay_progress(self, job_id, percent):
+        if job_id in self.jobs:
+            self.progress.emit(job_id, percent)
+
+    def _relay_finished(self, job_id, file_names):
+        if self.jobs.pop(job_id, None) is not None:
+            self.finished.emit(job_id, file_names)
+
+    def _relay_error(self, job_id, message):
+        if self.jobs.pop(job_id, None) is not None:
+            self.error.emit(job_id, message)
+
+    # --- Service thread ---
+
+    def _serve(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            if job.cancelled.is_set():
+                continue
+            self._job_started.emit(job.id)
+            written = []
+            for index, (kind, file_name) in enumerate(job.targets):
+                try:
+                    self.exporters[kind].export(
+                        job.snapshot, file_name,
+                        lambda done, total, index=index: self._report(job, index, done, total))
+                except ExportCancelled:
+                    self._remove(file_name)
+                    break
+                except Exception as e:
+                    self._remove(file_name)
+                    self._error_raised.emit(job.id, f"Could not export {file_name}:\n{e}")
+                    break
+                written.append(file_name)
+            else:
+                self._job_finished.emit(job.id, written)
+
+    def _report(self, job, index, done, total):
+        """Progress callback handed to the exporters; stops the export once the job is cancelled."""
+        if job.cancelled.is_set():
+            raise ExportCancelled()
+        percent = int(100 * (index + done / total) / len(job.targets))
+        if percent != job.percent:
+            job.percent = percent
+            self._progress_made.emit(job.id, percent)
+
+    @staticmethod
+    def _remove(file_name):
+        try:
+            os.remove(file_name)
+        except OSError:
+            pass
@@ -1,15 +1,18 @@
+import os
+
 import PySide6.QtCore
 
 from PySide6.QtGui import (QTextCursor, QPainter, QColor, QFont, QKeySequence, 
-                           QImage, QAction, QIcon, QPen)
+                           QAction, QIcon, QPen)
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QTextEdit, QPushButton,
                               QHBoxLayout, QLabel, QSplitter, QFileDialog, QMenu,
                               QMessageBox, QToolBar, QLineEdit, QGridLayout,
                               QSizePolicy, QStyle, QSizeGrip, QToolButton)
-from PySide6.QtCore import Qt, QPointF, Signal, QTimer, QEvent, QRectF
+from PySide6.QtCore import Qt, QPointF, Signal, QTimer, QEvent, QRectF, QSize
 
-from app_utils import StyleSheet, AIWorker, IconFactory
+from app_utils import StyleSheet, AICache, AIService, IconFactory
 from graphics_items import MindMapView
+from mindmap_export import MapSnapshot, PngExporter, SvgExporter, PdfExporter, ExportService
 
 class LoadingIndicator(QWidget):
     """A simple, animated spinning indicator for loading states."""
@@ -84,7 +87,7 @@ class EditorPanel(QWidget):
         
         self.export_action = QAction("Export", self)
         self.export_action.setShortcut("Ctrl+Shift+E")
-        self.export_action.setToolTip("Export as PNG (Ctrl+Shift+E)")
+        self.export_action.setToolTip("Export as PNG, SVG or PDF (Ctrl+Shift+E)")
         
         self.fit_view_action = QAction("Fit All", self)
         self.fit_view_action.setShortcut("Home")
@@ -130,7 +133,21 @@ class EditorPanel(QWidget):
         self.search_box.setPlaceholderText("🔍 Search nodes...")
         self.search_box.setMaximumWidth(200)
         self.search_box.setContentsMargins(0, 0, 0, 0)
-        self.search_box.textChanged.connect(self.search_nodes)
+        self.search_box.textChanged.connect(self.on_search_text_changed)
+        self.search_box.returnPressed.connect(lambda: self.show_search_result(1))
+
+        self.previous_result_action = QAction("Previous Result", self)
+        self.previous_result_action.setShortcut("Shift+F3")
+        self.previous_result_action.setToolTip("Previous Result (Shift+F3)")
+        self.previous_result_action.triggered.connect(lambda: self.show_search_result(-1))
+
+        self.next_result_action = QAction("Next Result", self)
+        self.next_result_action.setShortcut("F3")
+        self.next_result_action.setToolTip("Next Result (F3 / Enter)")
+        self.next_result_action.triggered.connect(lambda: self.show_search_result(1))
+
+        self.search_box.addAction(self.previous_result_action, QLineEdit.TrailingPosition)
+        self.search_box.addAction(self.next_result_action, QLineEdit.TrailingPosition)
         self.toolbar.addWidget(self.search_box)
         
         layout.addWidget(self.toolbar)
@@ -151,9 +168,29 @@ class EditorPanel(QWidget):
         self.breadcrumb_label.setObjectName("BreadcrumbLabel")
         
         self.loading_indicator = LoadingIndicator(self)
+
+        self.cancel_ai_action = QAction("Cancel", self)
+        self.cancel_ai_action.setToolTip("Cancel AI Enhancement")
+        self.cancel_ai_button = QToolButton(self)
+        self.cancel_ai_button.setDefaultAction(self.cancel_ai_action)
+        self.cancel_ai_button.setIconSize(QSize(12, 12))
+        self.cancel_ai_button.hide()
+
+        self.export_status_label = QLabel()
+        self.export_status_label.setObjectName("ExportStatusLabel")
+        self.export_status_label.hide()
+        self.cancel_export_action = QAction("Cancel", self)
+        self.cancel_export_action.setToolTip("Cancel Export")
+        self.cancel_export_button = QToolButton(self)
+        self.cancel_export_button.setDefaultAction(self.cancel_export_action)
+        self.cancel_export_button.setIconSize(QSize(12, 12))
+        self.cancel_export_button.hide()
         
         status_layout.addWidget(self.breadcrumb_label, 1)
         status_layout.addWidget(self.loading_indicator)
+        status_layout.addWidget(self.cancel_ai_button)
+        status_layout.addWidget(self.export_status_label)
+        status_layout.addWidget(self.cancel_export_button)
         
         layout.addWidget(self.status_bar)
 
@@ -163,6 +200,11 @@ class EditorPanel(QWidget):
         self.render_debounce_timer.setInterval(750)
         self.render_debounce_timer.timeout.connect(self.request_render)
 
+        self.search_debounce_timer = QTimer(self)
+        self.search_debounce_timer.setSingleShot(True)
+        self.search_debounce_timer.setInterval(150)
+        self.search_debounce_timer.timeout.connect(lambda: self.search_nodes(self.search_box.text()))
+
         self.text_edit.textChanged.connect(self.on_text_changed)
         self.mind_map_view = None
 
@@ -174,6 +216,10 @@ class EditorPanel(QWidget):
         self.render_action.setIcon(IconFactory.create_icon("render", icon_color))
         self.enhance_action.setIcon(IconFactory.create_icon("enhance", icon_color))
         self.export_action.setIcon(IconFactory.create_icon("export", icon_color))
+        self.previous_result_action.setIcon(IconFactory.create_icon("previous", icon_color))
+        self.next_result_action.setIcon(IconFactory.create_icon("next", icon_color))
+        self.cancel_ai_action.setIcon(IconFactory.create_icon("cancel", icon_color))
+        self.cancel_export_action.setIcon(IconFactory.create_icon("cancel", icon_color))
 
     def on_text_changed(self): 
         self.render_debounce_timer.start()
@@ -181,10 +227,21 @@ class EditorPanel(QWidget):
     def request_render(self): 
         self.renderRequested.emit()
         
+    def on_search_text_changed(self):
+        self.search_debounce_timer.start()
+
     def search_nodes(self, text):
         if self.mind_map_view: 
             self.mind_map_view.scene().search_nodes(text)
 
+    def show_search_result(self, step):
+        """Centres the map on the next or previous search hit, flushing a pending search first."""
+        if self.search_debounce_timer.isActive():
+            self.search_debounce_timer.stop()
+            self.search_nodes(self.search_box.text())
+        if self.mind_map_view:
+            self.mind_map_view.show_search_result(step)
+
 class TitleBar(QWidget):
     """custom title bar with standard icons and behavior."""
     def __init__(self, parent=None):
@@ -257,13 +314,18 @@ class TitleBar(QWidget):
 
 class MainWindow(QWidget):
     """Main application window with custom title bar, editor, and mind map view."""
+    EXPORT_FILTERS = {
+        "png": "PNG Files (*.png)",
+        "svg": "SVG Files (*.svg)",
+        "pdf": "PDF Files (*.pdf)",
+    }
+    ALL_FORMATS_FILTER = "All Formats (*.png *.svg *.pdf)"
+
     def __init__(self):
         super().__init__()
         self.is_dark_theme = True
         self.setWindowFlags(Qt.FramelessWindowHint)
         self.setGeometry(100, 100, 1600, 900)
-        
-        self.setStyleSheet("background-color: #3f3f3f;")
 
         main_layout = QGridLayout()
         main_layout.setContentsMargins(1, 1, 1, 1)
@@ -304,25 +366,27 @@ class MainWindow(QWidget):
         self.editor_panel.mind_map_view = self.mind_map_view
         
         self.current_file = None
-        self.ai_worker = None
+        self.ai_service = AIService(cache=AICache(), parent=self)
+        self.export_service = ExportService(
+            {"png": PngExporter(), "svg": SvgExporter(), "pdf": PdfExporter()}, parent=self)
+        self.export_status_timer = QTimer(self)
+        self.export_status_timer.setSingleShot(True)
+        self.export_status_timer.setInterval(5000)
+        self.export_status_timer.timeout.connect(self.clear_export_status)
         self.original_breadcrumb_text = ""
         self.setup_connections()
         self.editor_panel.theme_toggle_action.setChecked(self.is_dark_theme)
         self.apply_theme()
+        # The toolbar is still hidden, so its cached size hint missed the new style and icons.
+        self.editor_panel.toolbar.updateGeometry()
         self.load_example_content()
 
     def apply_theme(self):
-        if self.is_dark_theme:
-            self.container_widget.setStyleSheet(StyleSheet.DARK_THEME)
-            self.mind_map_view.scene().setBackgroundBrush(QColor("#2a2a2a"))
-            self.setStyleSheet("background-color: #3f3f3f;")
-            icon_color = QColor("#d4d4d4")
-        else:
-            self.container_widget.setStyleSheet(StyleSheet.LIGHT_THEME)
-            self.mind_map_view.scene().setBackgroundBrush(QColor("#ffffff"))
-            self.setStyleSheet("background-color: #cccccc;")
-            icon_color = QColor("#1e1e1e")
-        
+        # The window's one stylesheet covers every widget; it is only re-applied when the theme changed.
+        style_sheet = StyleSheet.for_theme(self.is_dark_theme)
+        if self.styleSheet() != style_sheet:
+            self.setStyleSheet(style_sheet)
+        icon_color = QColor("#d4d4d4") if self.is_dark_theme else QColor("#1e1e1e")
         self.editor_panel.update_icons(icon_color)
         self.mind_map_view.set_theme(self.is_dark_theme)
 
@@ -348,21 +412,37 @@ class MainWindow(QWidget):
         self.editor_panel.open_action.triggered.connect(self.open_file)
         self.editor_panel.save_action.triggered.connect(self.save_file)
         self.editor_panel.enhance_action.triggered.connect(self.enhance_with_ai)
+        self.editor_panel.cancel_ai_action.triggered.connect(self.ai_service.cancel)
+        self.ai_service.chunk.connect(self.handle_ai_chunk)
+        self.ai_service.preview.connect(self.handle_ai_preview)
+        self.ai_service.progress.connect(self.handle_ai_progress)
+        self.ai_service.finished.connect(self.handle_ai_result)
+        self.ai_service.error.connect(self.handle_ai_error)
+        self.ai_service.cancelled.connect(self.handle_ai_cancelled)
+        self.editor_panel.cancel_export_action.triggered.connect(lambda: self.export_service.cancel())
+        self.export_service.progress.connect(self.handle_export_progress)
+        self.export_service.finished.connect(self.handle_export_finished)
+        self.export_service.error.connect(self.handle_export_error)
+        self.export_service.cancelled.connect(self.handle_export_cancelled)
         self.editor_panel.renderRequested.connect(self.render_markdown)
         self.mind_map_view.scene().nodeSelected.connect(self.handle_node_selection)
+        self.mind_map_view.renderFinished.connect(self.fit_view)
         self.editor_panel.fit_view_action.triggered.connect(self.fit_view)
         self.editor_panel.zoom_selection_action.triggered.connect(self.zoom_to_selection)
         self.editor_panel.theme_toggle_action.triggered.connect(self.toggle_theme)
 
     def fit_view(self):
-        if self.mind_map_view.scene().items():
-            self.mind_map_view.fitInView(self.mind_map_view.scene().itemsBoundingRect(), Qt.KeepAspectRatio)
+        if self.mind_map_view.scene().model.nodes:
+            self.mind_map_view.fitInView(self.mind_map_view.scene().content_rect(), Qt.KeepAspectRatio)
     
     def zoom_to_selection(self):
-        selected_items = self.mind_map_view.scene().selectedItems()
-        if not selected_items: return
+        scene = self.mind_map_view.scene()
+        selected_items = scene.selectedItems()
+        if not selected_items and not scene.search_matches: return
         bounding_rect = QRectF()
         for item in selected_items: bounding_rect = bounding_rect.united(item.sceneBoundingRect())
+        for node in scene.search_matches:
+            if node.visible: bounding_rect = bounding_rect.united(QRectF(node.x, node.y, node.width, node.height))
         self.mind_map_view.fitInView(bounding_rect, Qt.KeepAspectRatio)
     
     def enhance_with_ai(self):
@@ -371,17 +451,36 @@ class MainWindow(QWidget):
             QMessageBox.warning(self, "Input Required", "Please enter some text to enhance.")
             return
             
-        self.editor_panel.enhance_action.setEnabled(False)
-        self.editor_panel.render_action.setEnabled(False)
-
-        self.original_breadcrumb_text = self.editor_panel.breadcrumb_label.text()
+        # A second request while one is running supersedes it.
+        if not self.ai_service.is_busy():
+            self.editor_panel.render_action.setEnabled(False)
+            self.original_breadcrumb_text = self.editor_panel.breadcrumb_label.text()
+            self.editor_panel.loading_indicator.startAnimation()
+            self.editor_panel.cancel_ai_button.show()
         self.editor_panel.breadcrumb_label.setText("Enhancing with AI...")
-        self.editor_panel.loading_indicator.startAnimation()
-        
-        self.ai_worker = AIWorker(raw_text)
-        self.ai_worker.finished.connect(self.handle_ai_result)
-        self.ai_worker.error.connect(self.handle_ai_error)
-        self.ai_worker.start()
+
+        self.ai_stream_text = ""
+        self.ai_stream_rendered = 0
+        self.ai_service.submit(raw_text)
+
+    def handle_ai_chunk(self, chunk):
+        """Re-renders the map from the complete lines streamed so far whenever a new heading arrives."""
+        self.ai_stream_text += chunk
+        end = self.ai_stream_text.rfind('\n') + 1
+        if end <= self.ai_stream_rendered:
+            return
+        new_lines = self.ai_stream_text[self.ai_stream_rendered:end].splitlines()
+        self.ai_stream_rendered = end
+        if any(line.lstrip().startswith('#') for line in new_lines):
+            self.mind_map_view.request_render(self.ai_stream_text[:end])
+
+    def handle_ai_preview(self, markdown_text):
+        """Shows the merge of the chunks a long enhancement has finished so far."""
+        self.ai_stream_rendered = len(markdown_text)
+        self.mind_map_view.request_render(markdown_text)
+
+    def handle_ai_progress(self, done, total):
+        self.editor_panel.breadcrumb_label.setText(f"Enhancing with AI... ({done}/{total} parts)")
 
     def handle_ai_result(self, markdown_text):
         self.editor_panel.text_edit.textChanged.disconnect(self.editor_panel.on_text_changed)
@@ -391,13 +490,21 @@ class MainWindow(QWidget):
         self.reset_ai_button_state()
 
     def handle_ai_error(self, error_message):
+        if self.ai_stream_rendered:
+            # Put the map back in line with the editor after a partial stream.
+            self.render_markdown()
         QMessageBox.critical(self, "AI Error", error_message)
         self.reset_ai_button_state()
 
+    def handle_ai_cancelled(self):
+        if self.ai_stream_rendered:
+            self.render_markdown()
+        self.reset_ai_button_state()
+
     def reset_ai_button_state(self):
-        self.editor_panel.enhance_action.setEnabled(True)
         self.editor_panel.render_action.setEnabled(True)
         self.editor_panel.loading_indicator.stopAnimation()
+        self.editor_panel.cancel_ai_button.hide()
         self.editor_panel.breadcrumb_label.setText(self.original_breadcrumb_text)
 
     def load_example_content(self):
@@ -420,6 +527,7 @@ class MainWindow(QWidget):
     def new_file(self):
         if self.maybe_save():
             self.editor_panel.text_edit.clear()
+            self.mind_map_view.cancel_render()
             self.mind_map_view.scene().clear_nodes()
             self.current_file = None
             self.setWindowTitle("Mind Map Editor - New File")
@@ -452,6 +560,9 @@ class MainWindow(QWidget):
     def load_file(self, file_name):
         try:
             with open(file_name, 'r', encoding='utf-8') as file: content = file.read()
+            # A different document starts from a fresh map rather than reconciling with the old one.
+            self.mind_map_view.cancel_render()
+            self.mind_map_view.scene().clear_nodes()
             self.editor_panel.text_edit.setText(content)
             self.current_file = file_name
             self.setWindowTitle(f"Mind Map Editor - {file_name}")
@@ -461,6 +572,11 @@ class MainWindow(QWidget):
             QMessageBox.warning(self, "Load Error", f"Failed to load file: {str(e)}")
             return False
 
+    def closeEvent(self, event):
+        self.ai_service.shutdown()
+        self.export_service.shutdown()
+        super().closeEvent(event)
+
     def maybe_save(self):
         if not self.editor_panel.text_edit.document().isModified(): return True
         ret = QMessageBox.warning(self, "Mind Map", "The document has been modified.\nDo you want to save your changes?", QMessageBox.Save | QMessageBox.Discard | QMessageBox.Cancel)
@@ -469,39 +585,85 @@ class MainWindow(QWidget):
         return True
 
     def export_mind_map(self):
-        file_name, _ = QFileDialog.getSaveFileName(self, "Export as PNG", "", "PNG Files (*.png)")
+        file_name, selected_filter = QFileDialog.getSaveFileName(
+            self, "Export Mind Map", "", ";;".join([*self.EXPORT_FILTERS.values(), self.ALL_FORMATS_FILTER]))
         if not file_name:
             return
-        self.export_as_png(file_name)
-
+        base, extension = os.path.splitext(file_name)
+        kind = extension[1:].lower()
+        if selected_filter == self.ALL_FORMATS_FILTER:
+            targets = [(fmt, f"{base if kind in self.EXPORT_FILTERS else file_name}.{fmt}") for fmt in self.EXPORT_FILTERS]
+            # The dialog only confirmed overwriting the name that was typed.
+            existing = [name for _, name in targets if name != file_name and os.path.exists(name)]
+            if existing:
+                names = "\n".join(os.path.basename(name) for name in existing)
+                ret = QMessageBox.question(self, "Export Mind Map", f"These files already exist:\n{names}\nDo you want to replace them?")
+                if ret != QMessageBox.Yes:
+                    return
+            self.export_to(targets)
+            return
+        if kind not in self.EXPORT_FILTERS:
+            kind = next((k for k, f in self.EXPORT_FILTERS.items() if f == selected_filter), "png")
+            file_name += "." + kind
+        self.export_to([(kind, file_name)])
 
     def export_as_png(self, file_name):
+        return self.export_to([("png", file_name)])
+
+    def export_as_svg(self, file_name):
+        return self.export_to([("svg", file_name)])
+
+    def export_as_pdf(self, file_name):
+        return self.export_to([("pdf", file_name)])
+
+    def export_to(self, targets):
+        """Queues writing the map to each (format, file name) in `targets` and returns the job id."""
         scene = self.mind_map_view.scene()
-        if not scene.items():
+        if not scene.model.nodes:
             QMessageBox.information(self, "Export Aborted", "Cannot export an empty mind map.")
-            return
-            
-        scene_rect = scene.itemsBoundingRect()
-        
-        image = QImage(scene_rect.size().toSize(), QImage.Format_ARGB32)
-        image.fill(Qt.transparent)
-        
-        painter = QPainter(image)
-        painter.setRenderHint(QPainter.Antialiasing)
-        
-        painter.translate(-scene_rect.topLeft())
-        
-        scene.render(painter)
-        painter.end()
-        
-        image.save(file_name)
-        QMessageBox.information(self, "Export Successful", f"Mind map exported to {file_name}")
+            return None
+
+        snapshot = MapSnapshot(scene.model, scene.theme)
+        job_id = self.export_service.submit(snapshot, targets)
+        self.editor_panel.export_status_label.setToolTip("")
+        self.update_export_status("Exporting...")
+        return job_id
+
+    def update_export_status(self, text=None):
+        """Shows `text` next to the cancel button while exports are pending, and hides both otherwise."""
+        busy = self.export_service.is_busy()
+        if text:
+            self.editor_panel.export_status_label.setText(text)
+        self.editor_panel.export_status_label.setVisible(busy or bool(text))
+        self.editor_panel.cancel_export_button.setVisible(busy)
+
+    def handle_export_progress(self, job_id, percent):
+        queued = len(self.export_service.jobs) - 1
+        suffix = f" (+{queued} queued)" if queued > 0 else ""
+        self.update_export_status(f"Exporting... {percent}%{suffix}")
+
+    def handle_export_finished(self, job_id, file_names):
+        names = ", ".join(os.path.basename(name) for name in file_names)
+        self.update_export_status(f"Exported {names}")
+        self.editor_panel.export_status_label.setToolTip("\n".join(file_names))
+        self.export_status_timer.start()
+
+    def handle_export_error(self, job_id, message):
+        self.update_export_status("Export failed")
+        self.export_status_timer.start()
+        QMessageBox.critical(self, "Export Failed", message)
+
+    def handle_export_cancelled(self, job_id):
+        self.update_export_status("Export cancelled")
+        self.export_status_timer.start()
+
+    def clear_export_status(self):
+        if not self.export_service.is_busy():
+            self.editor_panel.export_status_label.hide()
 
     def handle_node_selection(self, node):
         if node:
-            path = []; curr = node
-            while curr: path.append(curr.text); curr = curr.parent
-            breadcrumb_text = " > ".join(reversed(path))
+            breadcrumb_text = " > ".join(node.path())
         else:
             breadcrumb_text = "No node selected"
 
@@ -512,5 +674,4 @@ class MainWindow(QWidget):
 
     def render_markdown(self):
         markdown_text = self.editor_panel.text_edit.toPlainText()
-        self.mind_map_view.parse_and_render_markdown(markdown_text)
-        self.fit_view()
\ No newline at end of file
+        self.mind_map_view.request_render(markdown_text)
\ No newline at end of file
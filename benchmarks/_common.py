@@ -0,0 +1,37 @@
+"""Outline generator and view setup shared by the Qt benchmarks."""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "Mind-Map", "Mind-Map"))
+
+from graphics_items import MindMapView
+
+
+def generate_outline(count, fan_out=10):
+    """Returns a balanced outline of `count` headings, each with up to `fan_out` children."""
+    depth = 1
+    while fan_out ** depth < count:
+        depth += 1
+    lines = []
+
+    def emit(level):
+        lines.append("#" * (level + 1) + " Heading %d" % len(lines))
+        if level < depth:
+            for _ in range(fan_out):
+                if len(lines) >= count:
+                    return
+                emit(level + 1)
+
+    emit(0)
+    return "\n".join(lines)
+
+
+def open_map_view(count):
+    """Shows a view of a `count`-node outline with an item for every node."""
+    view = MindMapView()
+    # Large maps would be virtualized; keep an item for every node instead.
+    view.LARGE_MAP_NODES = count
+    view.resize(1200, 800)
+    view.show()
+    view.parse_and_render_markdown(generate_outline(count))
+    return view
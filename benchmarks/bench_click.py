@@ -0,0 +1,50 @@
+"""
+Benchmarks click-to-select latency on a large map.
+
+Usage: python benchmarks/bench_click.py [--nodes N] [--clicks N]
+Set QT_QPA_PLATFORM=offscreen to run without a display.
+"""
+import argparse
+import sys
+import time
+
+from PySide6.QtCore import Qt
+from PySide6.QtTest import QTest
+from PySide6.QtWidgets import QApplication
+
+from _common import open_map_view
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=100000, help="nodes in the map")
+    parser.add_argument("--clicks", type=int, default=100, help="nodes to click, spread over the map")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    start = time.perf_counter()
+    view = open_map_view(args.nodes)
+    scene = view.scene()
+    print("%d nodes, %d items, built in %.1f s" % (len(scene.model.nodes), len(scene.items()), time.perf_counter() - start))
+
+    nodes = scene.model.nodes
+    step = max(1, len(nodes) // args.clicks)
+    times = []
+    for node in nodes[step // 2::step]:
+        # Left of the label and clear of the collapse button on the right.
+        x, y = node.x + 8, node.y + node.height / 2
+        view.centerOn(x, y)
+        app.processEvents()
+        position = view.mapFromScene(x, y)
+        start = time.perf_counter()
+        QTest.mouseClick(view.viewport(), Qt.LeftButton, Qt.NoModifier, position)
+        times.append(time.perf_counter() - start)
+        assert scene.selected_node is node, node.text
+
+    times.sort()
+    print("click-to-select over %d clicks: median %.2f ms, 90th percentile %.2f ms, max %.2f ms" % (
+        len(times), times[len(times) // 2] * 1000, times[len(times) * 9 // 10] * 1000, times[-1] * 1000))
+
+
+if __name__ == "__main__":
+    main()
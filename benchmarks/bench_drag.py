@@ -0,0 +1,52 @@
+"""
+Benchmarks dragging one node on maps of growing size.
+
+Usage: python benchmarks/bench_drag.py [--nodes N [N ...]] [--steps N]
+Set QT_QPA_PLATFORM=offscreen to run without a display.
+"""
+import argparse
+import sys
+import time
+
+from PySide6.QtCore import QPointF
+from PySide6.QtWidgets import QApplication
+
+from _common import open_map_view
+
+
+def drag_step_time(app, count, steps):
+    view = open_map_view(count)
+    scene = view.scene()
+
+    # A node with both a parent and children, so three kinds of region get dirtied.
+    node = next(node for node in scene.model.nodes[count // 2:] if node.parent and node.children)
+    # Zoomed out enough to show many nodes, but not so far that they lose their items.
+    view.scale(0.5, 0.5)
+    view.centerOn(node.x, node.y)
+    app.processEvents()
+    item = scene.node_items[node]
+
+    start = time.perf_counter()
+    for step in range(steps):
+        offset = QPointF(-3, 2) if step % 2 else QPointF(3, -2)
+        item.setPos(item.pos() + offset)
+        # Delivers the update request, which paints whatever the move dirtied.
+        app.processEvents()
+    elapsed = (time.perf_counter() - start) / steps
+    view.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--nodes", type=int, nargs="+", default=[1000, 10000, 50000], help="map sizes to drag on")
+    parser.add_argument("--steps", type=int, default=200, help="drag steps per map")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    for count in args.nodes:
+        print("%7d nodes  %7.2f ms per drag step" % (count, drag_step_time(app, count, args.steps) * 1000))
+
+
+if __name__ == "__main__":
+    main()
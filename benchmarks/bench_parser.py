@@ -0,0 +1,124 @@
+"""
+Benchmarks markdown heading parsing against the original two-pass parser.
+
+Usage: python benchmarks/bench_parser.py [--headings N] [--body-lines N] [--repeat N] [file.md]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "Mind-Map", "Mind-Map"))
+
+from mindmap_core import TidyTreeLayout, parse_markdown, tokenize_headings
+
+
+def two_pass_headings(text):
+    """The scan of the original parser, minus scene updates: counts levels, then collects headings."""
+    level_counts = {}
+    lines = text.split('\n')
+
+    for line in lines:
+        stripped_line = line.strip()
+        if stripped_line and stripped_line.startswith('#'):
+            level = stripped_line.count('#', 0, stripped_line.find(' ')) - 1
+            level_counts[level] = level_counts.get(level, 0) + 1
+
+    headings = []
+    for line_idx, line in enumerate(lines):
+        stripped_line = line.strip()
+        if not stripped_line or not stripped_line.startswith('#'):
+            continue
+        level = stripped_line.count('#', 0, stripped_line.find(' ')) - 1
+        node_text = stripped_line.lstrip('# ').strip()
+        if node_text:
+            headings.append((line_idx, level, node_text))
+    return headings
+
+
+def generate_document(headings, body_lines):
+    """Returns a markdown outline with `headings` headings four levels deep, each followed by body text."""
+    lines = ["# Root"]
+    for i in range(1, headings):
+        lines.append("#" * (2 + i % 3) + " Heading %d" % i)
+        lines.extend("Body text for heading %d, line %d, long enough to look like prose." % (i, j)
+                     for j in range(body_lines))
+    return "\n".join(lines) + "\n"
+
+
+def read_chunks(file_name):
+    with open(file_name, 'r', encoding='utf-8') as file:
+        while True:
+            chunk = file.read(1 << 16)
+            if not chunk:
+                return
+            yield chunk
+
+
+def best_time(function, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def peak_memory(function):
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("file", nargs="?", help="markdown file to parse instead of a generated one")
+    parser.add_argument("--headings", type=int, default=100000, help="headings in the generated document")
+    parser.add_argument("--body-lines", type=int, default=2, help="body lines after each generated heading")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per case; the best time is reported")
+    args = parser.parse_args()
+
+    temp_name = None
+    if args.file:
+        file_name = args.file
+        with open(file_name, 'r', encoding='utf-8') as file:
+            text = file.read()
+    else:
+        text = generate_document(args.headings, args.body_lines)
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', suffix=".md", delete=False) as file:
+            file.write(text)
+        file_name = temp_name = file.name
+
+    layout = TidyTreeLayout()
+    # Speedups are only given for the cases doing the same work as the original scan.
+    cases = [
+        ("two-pass scan (original)", True, lambda: two_pass_headings(text)),
+        ("tokenize_headings, string", True, lambda: sum(1 for _ in tokenize_headings(text))),
+        ("tokenize_headings, file chunks", True, lambda: sum(1 for _ in tokenize_headings(read_chunks(file_name)))),
+        ("parse_markdown", False, lambda: parse_markdown(text)),
+        ("parse_markdown + layout", False, lambda: layout.apply(parse_markdown(text))),
+    ]
+    try:
+        count = len(two_pass_headings(text))
+        assert count == sum(1 for _ in tokenize_headings(text))
+        print("%.1f MB, %d lines, %d headings" % (len(text.encode('utf-8')) / 1e6, text.count('\n'), count))
+        baseline = None
+        for name, comparable, function in cases:
+            elapsed = best_time(function, args.repeat)
+            if baseline is None:
+                baseline = elapsed
+            speedup = "%5.2fx" % (baseline / elapsed) if comparable else ""
+            print("%-32s %9.1f ms  %6s  peak %7.1f MB" % (name, elapsed * 1000, speedup, peak_memory(function) / 1e6))
+    finally:
+        if temp_name:
+            os.remove(temp_name)
+
+
+if __name__ == "__main__":
+    main()